@@ -16,6 +16,10 @@ USER_DATA_PATH = os.path.join(user_home_dir, 'StoryToolkitAI')
 if not os.path.exists(USER_DATA_PATH):
     os.makedirs(USER_DATA_PATH)
 
+# this is where we store the files that can be re-created at any time
+# (decoded audio, version check responses, compiled kernels etc.)
+CACHE_PATH = os.path.join(USER_DATA_PATH, 'cache')
+
 # this is where we store the app configuration
 APP_CONFIG_FILE_PATH = os.path.join(USER_DATA_PATH, 'config.json')
 
@@ -0,0 +1,80 @@
+import json
+import codecs
+
+# orjson is optional - it's a lot faster than the standard json module for large files (transcriptions, projects etc.)
+# but if it's not installed, we'll just use the standard json module
+try:
+    import orjson
+
+except ImportError:
+    orjson = None
+
+
+def loads(data: bytes or str):
+    """
+    This parses the json data using orjson (if available) or the standard json module
+    """
+
+    # remove the UTF-8 BOM if it's there, since neither of the parsers accepts it
+    if isinstance(data, bytes):
+        data = data.removeprefix(codecs.BOM_UTF8)
+    else:
+        data = data.removeprefix('\ufeff')
+
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+
+        # orjson is stricter than json (for eg. it doesn't accept NaN),
+        # so let the standard json module try again before giving up
+        except orjson.JSONDecodeError:
+            pass
+
+    return json.loads(data)
+
+
+def load_file(file_path: str):
+    """
+    This reads a json file and returns the parsed data
+    Raises json.JSONDecodeError if the file is not a valid json file
+    """
+
+    with open(file_path, 'rb') as json_file:
+        return loads(json_file.read())
+
+
+def dumps(data, indent: bool = False, sort_keys: bool = False) -> bytes:
+    """
+    This encodes the data to UTF-8 json bytes using orjson (if available) or the standard json module
+    (orjson only supports 2-space indentation, so we're using the same for the standard json module)
+    """
+
+    if orjson is not None:
+
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+
+        try:
+            return orjson.dumps(data, option=option)
+
+        # orjson doesn't support everything the standard json module does (for eg. integers larger than 64-bit),
+        # so let the standard json module try again before giving up
+        except orjson.JSONEncodeError:
+            pass
+
+    return json.dumps(data, indent=2 if indent else None, sort_keys=sort_keys, ensure_ascii=False).encode('utf-8')
+
+
+def dump_file(data, file_path: str, indent: bool = False):
+    """
+    This encodes the data to json and writes it to the file
+    The data is encoded before the file is opened, so an encoding error doesn't leave an empty file behind
+    """
+
+    json_encoded = dumps(data, indent=indent)
+
+    with open(file_path, 'wb') as json_file:
+        json_file.write(json_encoded)
@@ -1,21 +1,60 @@
 import sys
 import os
-import json
+import stat
 import platform
 import subprocess
 import time
+import atexit
+import logging
 
-from threading import Thread
+from threading import Thread, Event, Timer, Lock
 
-from storytoolkitai import USER_DATA_PATH, APP_CONFIG_FILE_PATH, initial_target_dir
+from storytoolkitai import USER_DATA_PATH, APP_CONFIG_FILE_PATH, CACHE_PATH, initial_target_dir
 from storytoolkitai.core.logger import logger
 from storytoolkitai.core.logger import Style as loggerStyle
 from storytoolkitai.core.post_update import post_update
+from storytoolkitai.core import json_utils
 
-from requests import get
+from packaging.version import Version, InvalidVersion
+
+# the directory of this module - computed only once, since os.path.abspath needs to call getcwd() each time
+_MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# the folder of the main script (or of the executable, for standalone releases)
+# - computed only once, without resolving symlinks, since realpath needs to stat each part of the path
+_APP_DIR = os.path.dirname(sys.executable if getattr(sys, 'frozen', False) else os.path.abspath(sys.argv[0]))
+
+# the platform doesn't change while the app is running, so only ask for it once
+_PLATFORM_SYSTEM = platform.system()
+_PLATFORM_MACHINE = platform.machine().lower()
+_IS_MAC = _PLATFORM_SYSTEM == 'Darwin'
+_IS_WIN = _PLATFORM_SYSTEM == 'Windows'
+
+# used to tell apart missing settings from settings that are set to None
+_SENTINEL = object()
+
+# this is where we cache the responses of the version checks
+VERSION_CACHE_FILE_PATH = os.path.join(CACHE_PATH, 'version.json')
+
+# for how long (in seconds) we trust the cached version check responses before asking the server again
+VERSION_CACHE_MAX_AGE = 6 * 60 * 60
+
+# this is where we remember the FFmpeg binary that worked during the previous session
+FFMPEG_CACHE_FILE_PATH = os.path.join(CACHE_PATH, 'ffmpeg.json')
+
+# for how long (in seconds) we wait for other setting changes before writing the config file
+CONFIG_FLUSH_DELAY = 0.5
 
 
 class StoryToolkitAI:
+
+    # the result of the FFmpeg check, so that we only run it once per session (see check_ffmpeg)
+    _ffmpeg_available = None
+
+    # the HTTP session shared by all the requests to our servers and GitHub (see _get_http_session)
+    _http_session = None
+    _http_session_lock = Lock()
+
     def __init__(self, server=False, args=None):
         # import version.py - this holds the version stored locally
         import version
@@ -35,6 +74,16 @@ class StoryToolkitAI:
         # create a config variable
         self.config = None
 
+        # the config file is written by a timer shortly after the last setting change
+        # (see save_config), so make sure that nothing is lost when the app exits
+        self._config_flush_timer = None
+        self._config_dirty = False
+        self._config_lock = Lock()
+
+        # once we know that the user data directory exists, we don't need to check it before each config write
+        self._user_data_dir_verified = False
+        atexit.register(self.flush_config)
+
         # define the api variables
         self.api_possible = False
         self.api_user = None
@@ -43,6 +92,14 @@ class StoryToolkitAI:
         self.api = None
         self.api_key_valid = False
 
+        # the API socket is shared by the ping thread and the other commands,
+        # so only one command can be sent (and its response read) at a time
+        self._api_lock = Lock()
+
+        # the API responses are read into this buffer, so we don't allocate a new one for each response
+        self._api_recv_buffer = bytearray(4096)
+        self._api_recv_view = memoryview(self._api_recv_buffer)
+
         self.debug_mode = False
 
         # trigger post_update if necessary
@@ -53,6 +110,9 @@ class StoryToolkitAI:
                 is_standalone=self.standalone
         ):
 
+            # post_update may have changed the config file directly, so reload it before saving anything to it
+            self.config = self.get_config()
+
             # save the current version as the last_post_update
             self.save_config('last_update', self.version)
 
@@ -70,24 +130,30 @@ class StoryToolkitAI:
         # this is the directory that the user has last used in the file dialogs
         self.initial_target_dir = self.get_app_setting('last_target_dir', initial_target_dir)
 
+        # these remain None until the update check (which runs in the background) is done
         self.update_available = None
         self.online_version = None
 
+        # this is set once the update check is done, so others can wait for it (see toolkit_UI.update_wait)
+        self.update_check_done = Event()
+
         # check if a new version of the app exists on GitHub
         # but use either the release version number or version.py,
         # depending on standalone is True or False
-        if not self.cli_args or not self.cli_args.mode == 'cli' or not self.cli_args.skip_update_check:
-            def check_update_wrapper():
-                self.update_available, self.online_version = self.check_update()
-
-            Thread(target=check_update_wrapper).start()
+        if not self.cli_args or not self.cli_args.skip_update_check:
+            Thread(target=self._check_update_in_background, daemon=True).start()
         else:
             logger.debug("Skipping update check due to command line argument.")
 
-        logger.info(loggerStyle.BOLD + loggerStyle.UNDERLINE + "Running StoryToolkitAI{} version {} {}"
-                    .format(' SERVER' if server else '',
-                            self.__version__,
-                            '(standalone)' if self.standalone else ''))
+            # nothing to wait for, since the update check won't run
+            self.update_check_done.set()
+
+        # (only build the styled message if it's going to be logged)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(loggerStyle.BOLD + loggerStyle.UNDERLINE + "Running StoryToolkitAI{} version {} {}"
+                        .format(' SERVER' if server else '',
+                                self.__version__,
+                                '(standalone)' if self.standalone else ''))
 
         # we keep the backup intervals here in case we use them in both UI and ops
         # get the backup_transcript_saves_every_n_hours setting
@@ -98,39 +164,51 @@ class StoryToolkitAI:
         self.story_backup_interval = \
             self.get_app_setting(setting_name='backup_story_saves_every_n_hours', default_if_none=1)
 
+    def _check_update_in_background(self):
+        """
+        This runs the update check and lets everyone waiting for it know when it's done
+        (meant to be run in a separate thread, so that the app start isn't blocked by the network request)
+        """
+
+        try:
+            self.update_available, self.online_version = self.check_update()
+        finally:
+            self.update_check_done.set()
+
     def update_via_git(self):
         """
         This pulls the latest version from GitHub and restarts the app.
         """
 
-        # pull the latest version from GitHub via git pull
-        try:
+        # run all the git commands in the installation folder (../../ from this file)
+        # (without changing the working directory of the whole app)
+        repo_dir = os.path.abspath(os.path.join(_MODULE_DIR, '..', '..'))
 
-            # get the current working directory
-            cwd = os.getcwd()
+        def git(*args):
+            return subprocess.run(
+                ['git', '-C', repo_dir, *args], capture_output=True, text=True, check=True
+            ).stdout.strip()
 
-            # make sure that we're executing the git command in the right directory (../../ from this file)
-            os.chdir(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+        # pull the latest version from GitHub via git pull
+        try:
 
-            cwd = os.getcwd()
-            logger.debug('Running git pull in {}'.format(cwd))
+            logger.debug('Running git pull in {}'.format(repo_dir))
 
             # get the current commit hash
-            current_commit_hash = subprocess.check_output(['git', 'rev-parse', 'HEAD']).decode('ascii').strip()
-            logger.debug('Current commit: {}'.format(current_commit_hash))
-
-            # is the tool installed in a valid git repository?
+            # (this also tells us if the tool is installed in a valid git repository)
             try:
-                git_status = subprocess.check_output(['git', 'status']).decode('ascii').strip()
+                current_commit_hash = git('rev-parse', 'HEAD')
             except subprocess.CalledProcessError:
                 logger.error('The installation folder does not contain a valid git repository. '
                              'Unable to update StoryToolkitAI automatically. Please update manually.')
                 return False
 
+            logger.debug('Current commit: {}'.format(current_commit_hash))
+
             # do we have a remote called origin?
             added_remote = False
             try:
-                subprocess.check_output(['git', 'remote', 'get-url', 'origin']).decode('ascii').strip()
+                git('remote', 'get-url', 'origin')
 
             # if we get a non-zero exit code, it most likely means that the remote doesn't exist
             except subprocess.CalledProcessError:
@@ -141,23 +219,19 @@ class StoryToolkitAI:
                 # let's add the remote
                 logger.debug('Origin remote not found. Adding it.')
 
-                subprocess.check_output(
-                    ['git', 'remote', 'add', 'origin', origin_remote]
-                ).decode('ascii').strip()
+                git('remote', 'add', 'origin', origin_remote)
 
                 logger.debug('Origin remote {} added.'.format(origin_remote))
 
             # if the remote exists, make sure it's the right one
             if not added_remote:
-                subprocess.check_output(
-                    ['git', 'remote', 'set-url', 'origin', 'https://github.com/octimot/StoryToolkitAI.git']
-                ).decode('ascii').strip()
+                git('remote', 'set-url', 'origin', 'https://github.com/octimot/StoryToolkitAI.git')
 
             # pull the latest version from GitHub
-            subprocess.check_output(['git', 'pull', 'origin', 'main']).decode('ascii').strip()
+            git('pull', 'origin', 'main')
 
             # get the commit hash after the pull
-            latest_commit_hash = subprocess.check_output(['git', 'rev-parse', 'HEAD']).decode('ascii').strip()
+            latest_commit_hash = git('rev-parse', 'HEAD')
 
             # if the latest commit hash is the same as the current commit hash
             if latest_commit_hash == current_commit_hash:
@@ -171,8 +245,9 @@ class StoryToolkitAI:
             # restart the app
             self.restart()
 
-        except:
+        except (subprocess.CalledProcessError, OSError) as e:
             logger.error('Could not update StoryToolkitAI. Please update the app manually.')
+            logger.debug('Update error: {}'.format(getattr(e, 'stderr', None) or e))
             return False
 
     def restart(self):
@@ -180,6 +255,9 @@ class StoryToolkitAI:
         This attempts to restart the app.
 
         """
+        # write any pending config changes (os.execl doesn't run the atexit handlers)
+        self.flush_config()
+
         try:
             # restart the app while passing all the arguments
             if not self.standalone:
@@ -189,16 +267,13 @@ class StoryToolkitAI:
                 # as a list of strings
                 subprocess.Popen([sys.executable] + sys.argv)
 
-        except:
-            logger.error('Could not restart StoryToolkitAI. Please restart the app manually.')
+        except OSError:
+            logger.error('Could not restart StoryToolkitAI. Please restart the app manually.', exc_info=True)
 
     def update_statistics(self, key, value):
         '''
         Updates the statistics dictionary
         '''
-        if key not in self.statistics:
-            self.statistics[key] = 0
-
         self.statistics[key] = value
 
     def read_statistics(self, key):
@@ -207,11 +282,7 @@ class StoryToolkitAI:
         '''
 
         # return none if the key doesn't exist
-        if key not in self.statistics:
-            return None
-
-        # otherwise return the value
-        return self.statistics[key]
+        return self.statistics.get(key, None)
 
     def update_initial_target_dir(self, new_target_dir=None):
 
@@ -285,16 +356,17 @@ class StoryToolkitAI:
             self.config = self.get_config()
 
         # look for the requested setting
-        if setting_name in self.config:
+        setting_value = self.config.get(setting_name, _SENTINEL)
 
-            # and return it
-            return self.config[setting_name]
+        # and return it if it exists
+        if setting_value is not _SENTINEL:
+            return setting_value
 
         # if the requested setting doesn't exist in the config
         # but a default was passed
         elif default_if_none is not None:
 
-            logger.info('Config setting {} saved as "{}" '.format(setting_name, default_if_none))
+            logger.info('Config setting %s saved as "%s" ', setting_name, default_if_none)
 
             # save the default to the config
             self.save_config(setting_name=setting_name, setting_value=default_if_none)
@@ -309,38 +381,119 @@ class StoryToolkitAI:
     def save_config(self, setting_name=None, setting_value=None):
         '''
         Saves a setting to the app configuration file
+        When a single setting is passed, the file is written shortly after (together with any other changes),
+        but if nothing is passed, the config in memory is written to the file right away
         :param config_key:
         :param config_value:
         :return:
         '''
 
-        # if a setting name and value was passed
-        if setting_name is not None and setting_value is not None:
-            # get existing configuration
-            self.config = self.get_config()
+        # change the config under the lock, so that a flush that's running in the meantime
+        # doesn't write the config while we're changing it (or mark our change as saved)
+        with self._config_lock:
 
-            logger.info('Updated config file {} with {} data.'
-                        .format(os.path.abspath(APP_CONFIG_FILE_PATH), setting_name))
-            self.config[setting_name] = setting_value
+            # if a setting name and value was passed
+            if setting_name is not None and setting_value is not None:
+                # get existing configuration
+                # (but only if it wasn't loaded before - the config in memory is always the most recent one)
+                if self.config is None:
+                    self.config = self.get_config()
 
-        # if the config is empty something might be wrong
-        if self.config is None:
-            logger.error('Config file needs to be loaded before saving')
-            return False
+                logger.info('Updated config file %s with %s data.', APP_CONFIG_FILE_PATH, setting_name)
+                self.config[setting_name] = setting_value
+
+                # if the FFmpeg path changed, FFmpeg needs to be checked again
+                if setting_name == 'ffmpeg_path':
+                    StoryToolkitAI._ffmpeg_available = None
+
+            # if the config is empty something might be wrong
+            if self.config is None:
+                logger.error('Config file needs to be loaded before saving')
+                return False
 
-        # before writing the configuration to the config file
-        # check if the user data directory exists (and create it if not)
-        self.user_data_dir_exists(create_if_not=True)
+            self._config_dirty = True
 
-        # then write the config to the config json
-        with open(APP_CONFIG_FILE_PATH, 'w') as outfile:
-            json.dump(self.config, outfile, indent=3)
+        # single settings are often saved one after another (for eg. during the app start),
+        # so wait a bit and write them all at once
+        if setting_name is not None:
+            self._schedule_config_flush()
 
-            logger.info('Config file {} saved.'.format(os.path.abspath(APP_CONFIG_FILE_PATH)))
+        # but if the whole config was changed (for eg. in the preferences window), write it right away
+        else:
+            self.flush_config()
 
         # and return the config back to the user
         return self.config
 
+    def _schedule_config_flush(self):
+        """
+        This (re)starts the timer that writes the config to the config file
+        """
+
+        with self._config_lock:
+
+            if self._config_flush_timer is not None:
+                self._config_flush_timer.cancel()
+
+            self._config_flush_timer = Timer(CONFIG_FLUSH_DELAY, self.flush_config)
+            self._config_flush_timer.daemon = True
+            self._config_flush_timer.start()
+
+    def flush_config(self):
+        """
+        This writes the config from memory to the config file (if it changed since the last write)
+        The file is first written to a temporary file which then replaces the config file,
+        so the config file is never left half-written (for eg. if the app crashes during the write)
+        """
+
+        with self._config_lock:
+
+            # no need for the timer anymore, since we're writing the config now
+            if self._config_flush_timer is not None:
+                self._config_flush_timer.cancel()
+                self._config_flush_timer = None
+
+            # only write if something changed since the last write
+            if self.config is None or not self._config_dirty:
+                return False
+
+            # before writing the configuration to the config file
+            # check if the user data directory exists (and create it if not)
+            if not self._user_data_dir_verified:
+                self._user_data_dir_verified = self.user_data_dir_exists(create_if_not=True)
+
+            # encode the config now, so we write exactly what we're marking as saved below
+            config_json_encoded = json_utils.dumps(self.config, indent=True)
+
+            # mark the config as saved before writing it (if the write fails, we mark it as dirty again)
+            self._config_dirty = False
+
+            # then write the config to the config json
+            config_tmp_file_path = APP_CONFIG_FILE_PATH + '.tmp'
+            try:
+                with open(config_tmp_file_path, 'wb') as config_file:
+                    config_file.write(config_json_encoded)
+
+                os.replace(config_tmp_file_path, APP_CONFIG_FILE_PATH)
+
+            except OSError:
+                logger.error('Cannot save config file %s.', APP_CONFIG_FILE_PATH, exc_info=True)
+
+                # the config still needs to be saved
+                self._config_dirty = True
+
+                # don't leave the temporary file behind
+                try:
+                    os.remove(config_tmp_file_path)
+                except OSError:
+                    pass
+
+                return False
+
+            logger.info('Config file %s saved.', APP_CONFIG_FILE_PATH)
+
+        return True
+
     def get_config(self):
         '''
         Gets the app configuration from the config file (if one exists)
@@ -348,36 +501,35 @@ class StoryToolkitAI:
         '''
 
         # read the config file if it exists
-        if os.path.exists(APP_CONFIG_FILE_PATH):
-            logger.debug('Loading config file {}.'.format(APP_CONFIG_FILE_PATH))
-
-            try:
-                # read the app config
-                with open(APP_CONFIG_FILE_PATH, 'r') as json_file:
-                    self.config = json.load(json_file)
-
-                # and return the config
-                return self.config
-
-            except:
-                logger.error('Unable to read config file {}.'.format(APP_CONFIG_FILE_PATH))
-                logger.error('Make sure that it is a valid json file. '
-                             'If you are not sure, delete it or rename it and restart the tool. '
-                             'But keep in mind that you will lose all your settings.')
+        # (just try to open it, instead of checking if it exists first)
+        try:
+            # read the app config
+            logger.debug('Loading config file %s.', APP_CONFIG_FILE_PATH)
+            self.config = json_utils.load_file(APP_CONFIG_FILE_PATH)
 
-                sys.exit()
+            # and return the config
+            return self.config
 
         # if the config file doesn't exist, return an empty dict
-        else:
-            logger.debug('No config file found at {}.'.format(APP_CONFIG_FILE_PATH))
+        except FileNotFoundError:
+            logger.debug('No config file found at %s.', APP_CONFIG_FILE_PATH)
             return {}
 
+        except (OSError, ValueError):
+            logger.error('Unable to read config file {}.'.format(APP_CONFIG_FILE_PATH))
+            logger.error('Make sure that it is a valid json file. '
+                         'If you are not sure, delete it or rename it and restart the tool. '
+                         'But keep in mind that you will lose all your settings.')
+
+            sys.exit()
+
     def check_api_thread(self, api_key=None):
         """
         This opens a thread that checks if the API key is valid
         """
 
-        check_api_thread = Thread(target=self.check_api_key, kwargs={'api_key': api_key})
+        # (as a daemon thread, so that a slow response doesn't keep the app from closing)
+        check_api_thread = Thread(target=self.check_api_key, kwargs={'api_key': api_key}, daemon=True)
         check_api_thread.start()
 
         return
@@ -404,7 +556,7 @@ class StoryToolkitAI:
             # check if the API key is valid using the API
             try:
                 # access the check path
-                response = get(check_path, timeout=5)
+                response = self._get_http_session().get(check_path, timeout=5)
 
                 # if the response is 200 and the text response is 'true'
                 if response.status_code == 200 and response.text == 'true':
@@ -422,14 +574,98 @@ class StoryToolkitAI:
                     self.api_key_valid = False
                     return False
 
-            except:
+            # (this also covers the requests exceptions, without importing requests just for them)
+            except Exception:
                 logger.debug('Unable to check user API key.', exc_info=True)
-                pass
 
         logger.debug('No API key found.')
         self.api_key_valid = False
         return False
 
+    @staticmethod
+    def _get_http_session():
+        """
+        This returns the HTTP session that we use for all the requests in this class
+        (so that the connections are kept alive and reused instead of doing a new TLS handshake each time)
+        """
+
+        with StoryToolkitAI._http_session_lock:
+
+            if StoryToolkitAI._http_session is None:
+
+                # requests is only imported when we actually need it, since it takes a while to import
+                from requests import Session
+
+                StoryToolkitAI._http_session = Session()
+
+        return StoryToolkitAI._http_session
+
+    @staticmethod
+    def _get_cached_url(url, timeout=5, max_age=VERSION_CACHE_MAX_AGE):
+        """
+        This returns the text of the url response, using a local cache:
+        - if the cached response is newer than max_age (seconds), it's returned without any request
+        - otherwise, the request includes the ETag / Last-Modified of the cached response (if any)
+          so that the server can reply with an empty 304 if nothing changed since then
+        - if the request fails, the cached response is returned, even if it's older than max_age
+        """
+
+        # get the cached responses
+        version_cache = {}
+        if os.path.isfile(VERSION_CACHE_FILE_PATH):
+            try:
+                version_cache = json_utils.load_file(VERSION_CACHE_FILE_PATH)
+            except Exception:
+                logger.debug('Unable to read version cache file.', exc_info=True)
+
+        cached_response = version_cache.get(url, {})
+
+        # if we checked recently, don't bother the server again
+        if 'text' in cached_response and time.time() - cached_response.get('checked', 0) < max_age:
+            return cached_response['text']
+
+        headers = {}
+        if cached_response.get('etag', None):
+            headers['If-None-Match'] = cached_response['etag']
+        if cached_response.get('last_modified', None):
+            headers['If-Modified-Since'] = cached_response['last_modified']
+
+        try:
+            r = StoryToolkitAI._get_http_session().get(url, headers=headers, verify=True, timeout=timeout)
+
+            # nothing changed since the last request, so use the cached response
+            if r.status_code == 304 and 'text' in cached_response:
+                cached_response['checked'] = time.time()
+
+            else:
+                r.raise_for_status()
+
+                cached_response = {
+                    'etag': r.headers.get('ETag', None),
+                    'last_modified': r.headers.get('Last-Modified', None),
+                    'text': r.text,
+                    'checked': time.time()
+                }
+
+        # if we can't reach the server, use whatever we have in the cache (if anything)
+        except Exception:
+            if 'text' in cached_response:
+                logger.debug('Unable to get {}. Using the cached response.'.format(url), exc_info=True)
+                return cached_response['text']
+
+            raise
+
+        # save the response to the cache
+        version_cache[url] = cached_response
+
+        try:
+            os.makedirs(os.path.dirname(VERSION_CACHE_FILE_PATH), exist_ok=True)
+            json_utils.dump_file(version_cache, VERSION_CACHE_FILE_PATH)
+        except Exception:
+            logger.debug('Unable to write version cache file.', exc_info=True)
+
+        return cached_response['text']
+
     def check_update(self):
         '''
         This checks if there's a new version of the app on GitHub and returns True if it is and the version number
@@ -438,16 +674,19 @@ class StoryToolkitAI:
         :return: [bool, str online_version]
         '''
 
+        # this is only used when checking for standalone releases
+        latest_release = None
+
         # get the latest release from GitHub if release is True
         if self.standalone:
 
             try:
                 # get the latest release from GitHub
-                latest_release = (
-                    get('https://api.github.com/repos/octimot/storytoolkitai/releases/latest', timeout=5).json())
+                latest_release = json_utils.loads(
+                    self._get_cached_url('https://api.github.com/repos/octimot/storytoolkitai/releases/latest'))
 
                 # remove the 'v' from the release version (tag)
-                online_version_raw = latest_release['tag_name'].replace('v', '')
+                online_version_raw = latest_release['tag_name'].removeprefix('v')
 
             # show exception if it fails, but don't crash
             except Exception as e:
@@ -463,10 +702,10 @@ class StoryToolkitAI:
 
             # retrieve the latest version number from github
             try:
-                r = get(version_request, verify=True, timeout=5)
+                version_text = self._get_cached_url(version_request)
 
                 # extract the actual version number from the string
-                online_version_raw = r.text.split('"')[1]
+                online_version_raw = version_text.split('"')[1]
 
             # show exception if it fails, but don't crash
             except Exception as e:
@@ -476,68 +715,138 @@ class StoryToolkitAI:
                 # return False - no update available and None instead of an online version number
                 return False, None
 
-        # get the numbers in the version string
-        local_version = self.__version__.split(".")
-        online_version = online_version_raw.split(".")
+        try:
+            local_version = Version(self.__version__)
+            online_version = Version(online_version_raw)
+
+        except InvalidVersion:
+            logger.warning('Unable to compare the local version {} with the online version {}.'
+                           .format(self.__version__, online_version_raw))
+
+            return False, online_version_raw
 
         # did the use choose to ignore the update?
         ignore_update = self.get_app_setting(setting_name='ignore_update', default_if_none=False)
 
         # if they did, is the online version the same as the one they ignored?
-        if ignore_update and ignore_update.split(".") == online_version:
+        if ignore_update and ignore_update == online_version_raw:
             logger.info('Ignoring the new update (version {}) due to app settings.'.format(ignore_update))
 
             # return False - no update available and the local version number instead of what's online
             return False, self.__version__
 
-        # take each number in the version string and compare it with the local numbers
-        for n in range(len(online_version)):
+        # return false (and the online version) if the online version isn't newer than the local one
+        if online_version <= local_version:
+            return False, online_version_raw
+
+        # if we're checking for a standalone release
+        if self.standalone and latest_release is not None and 'assets' in latest_release:
+
+            release_files = latest_release['assets']
+            if len(release_files) == 0:
+                return False, online_version_raw
+
+            # is there a release file for mac, given the current architecture?
+            if _IS_MAC:
+                # check if there is a file that contains the current machine's architecture
+                release_file = [f for f in release_files if _PLATFORM_MACHINE in f['name'].lower()]
+                return len(release_file) > 0, online_version_raw
+
+            # if we're on windows, check if there is a file that contains 'win'
+            elif _IS_WIN:
+                release_file = [f for f in release_files if 'win' in f['name'].lower()]
+                return len(release_file) > 0, online_version_raw
+
+        # worst case, return True to make sure the user is notified despite the lack of a release file
+        return True, online_version_raw
+
+    @staticmethod
+    def check_ffmpeg(stAI=None):
+        """
+        Checks if FFmpeg is available, but only once per session
+        (or again, after the ffmpeg_path setting was changed)
+        """
+
+        if StoryToolkitAI._ffmpeg_available is None:
+            StoryToolkitAI._ffmpeg_available = StoryToolkitAI._check_ffmpeg(stAI=stAI)
+
+        return StoryToolkitAI._ffmpeg_available
+
+    @staticmethod
+    def _get_ffmpeg_cache_key():
+        """
+        This returns what the FFmpeg lookup depends on (besides the app settings),
+        so we know when the FFmpeg binary from the previous session might not be the right one anymore
+        """
+
+        return [_APP_DIR, os.getenv('FFMPEG_BINARY', ''), os.getenv('PATH', '')]
+
+    @staticmethod
+    def _get_cached_ffmpeg_binary(cache_key):
+        """
+        This returns the FFmpeg binary that worked during the previous session,
+        but only if nothing changed since then (neither the lookup, nor the binary itself)
+        """
 
-            # only test for the first 3 numbers in the version string
-            if n < 3:
-                # if there's a number larger online, return true
-                if int(online_version[n]) > int(local_version[n]):
+        try:
+            ffmpeg_cache = json_utils.load_file(FFMPEG_CACHE_FILE_PATH)
 
-                    # if we're checking for a standalone release
-                    if self.standalone and 'latest_release' in locals() and 'assets' in latest_release:
+            if ffmpeg_cache.get('key', None) != cache_key \
+                    or os.stat(ffmpeg_cache['binary']).st_mtime != ffmpeg_cache.get('mtime', None):
+                return None
+
+            return ffmpeg_cache['binary']
+
+        # no cache or the cached binary is gone
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+    @staticmethod
+    def _cache_ffmpeg_binary(cache_key, ffmpeg_binary, ffmpeg_mtime):
+        """
+        This remembers the FFmpeg binary that worked, so that we don't have to look for it again next time
+        """
 
-                        release_files = latest_release['assets']
-                        if len(release_files) == 0:
-                            return False, online_version_raw
+        try:
+            os.makedirs(os.path.dirname(FFMPEG_CACHE_FILE_PATH), exist_ok=True)
+            json_utils.dump_file(
+                {'key': cache_key, 'binary': ffmpeg_binary, 'mtime': ffmpeg_mtime},
+                FFMPEG_CACHE_FILE_PATH)
 
-                        # is there a release file for mac, given the current architecture?
-                        if platform.system() == 'Darwin':
-                            # check if there is a file that contains the current machine's architecture
-                            release_file = [f for f in release_files if platform.machine() in f['name'].lower()]
-                            return len(release_file) > 0, online_version_raw
+        except OSError:
+            logger.debug('Unable to write FFmpeg cache file.', exc_info=True)
 
-                        # if we're on windows, check if there is a file that contains 'win'
-                        elif platform.system() == 'Windows':
-                            release_file = [f for f in release_files if 'win' in f['name'].lower()]
-                            return len(release_file) > 0, online_version_raw
+    @staticmethod
+    def _use_ffmpeg_binary(ffmpeg_binary):
+        """
+        This sets the FFMPEG_BINARY environment variable and adds the FFmpeg folder to the PATH for this session
+        (but only if they're not already set, to avoid rewriting the environment for nothing)
+        """
 
-                    # worst case, return True to make sure the user is notified despite the lack of a release file
-                    return True, online_version_raw
+        if os.environ.get('FFMPEG_BINARY', None) != ffmpeg_binary:
+            os.environ['FFMPEG_BINARY'] = ffmpeg_binary
 
-                # continue the search if there's no version mismatch
-                if int(online_version[n]) == int(local_version[n]):
-                    continue
-                break
+        ffmpeg_dir = os.path.dirname(ffmpeg_binary)
+        paths = os.environ.get('PATH', '').split(os.pathsep)
 
-        # return false (and the online version) if the local and the online versions match
-        return False, online_version_raw
+        if ffmpeg_dir and ffmpeg_dir not in paths:
+            os.environ['PATH'] = os.pathsep.join(paths + [ffmpeg_dir])
 
     @staticmethod
-    def check_ffmpeg(stAI = None):
+    def _check_ffmpeg(stAI=None):
 
         # check if ffmpeg is installed
 
+        # what we need to know to tell if the FFmpeg binary from the previous session can still be used
+        # (this must be taken before we start changing the environment variables below)
+        ffmpeg_cache_key = StoryToolkitAI._get_ffmpeg_cache_key()
+
         try:
 
             if stAI is not None:
 
                 # first, check if the user added the FFmpeg path to the app settings
-                ffmpeg_path_custom = StoryToolkitAI.get_app_setting(setting_name='ffmpeg_path')
+                ffmpeg_path_custom = stAI.get_app_setting(setting_name='ffmpeg_path')
 
                 # if the ffmpeg path is not empty
                 if ffmpeg_path_custom is not None and ffmpeg_path_custom != '':
@@ -558,19 +867,37 @@ class StoryToolkitAI:
             else:
                 ffmpeg_path_custom = None
 
+            # if the FFmpeg binary we found during the previous session is still there, just use it
+            if ffmpeg_path_custom is None \
+                    and (cached_ffmpeg_binary := StoryToolkitAI._get_cached_ffmpeg_binary(ffmpeg_cache_key)):
+
+                logger.debug('Using FFmpeg found during a previous session: {}'.format(cached_ffmpeg_binary))
+
+                StoryToolkitAI._use_ffmpeg_binary(cached_ffmpeg_binary)
+
+                return True
+
             # otherwise try to find the binary next to the app
             # this is most likely the case for standalone releases
             if ffmpeg_path_custom is None:
 
-                main_script_path = os.path.realpath(sys.argv[0])
+                main_script_dir = _APP_DIR
 
-                ffmpeg_executable = 'ffmpeg.exe' if platform.system() == 'Windows' else 'ffmpeg'
+                ffmpeg_executable = 'ffmpeg.exe' if _IS_WIN else 'ffmpeg'
+
+                # list the main script folder once, so we know what's in it without checking each path separately
+                try:
+                    with os.scandir(main_script_dir) as entries:
+                        main_script_dir_entries = {entry.name: entry for entry in entries}
+                except OSError:
+                    main_script_dir_entries = {}
 
                 # ffmpeg should be in the same folder as the main script
-                ffmpeg_path = os.path.join(os.path.dirname(main_script_path), ffmpeg_executable)
+                ffmpeg_path = os.path.join(main_script_dir, ffmpeg_executable)
 
                 # and if it exists, define the environment variable for ffmpeg for this session
-                if os.path.isfile(ffmpeg_path):
+                if ffmpeg_executable in main_script_dir_entries \
+                        and main_script_dir_entries[ffmpeg_executable].is_file():
                     logger.debug('Found FFmpeg in current working directory.')
                     os.environ['FFMPEG_BINARY'] = ffmpeg_path
                 else:
@@ -579,8 +906,11 @@ class StoryToolkitAI:
 
                     # try to find it in '_internal' folder
                     # - this is where it's stored in the windows standalone version
-                    ffmpeg_path = os.path.join(os.path.dirname(main_script_path), '_internal', ffmpeg_executable)
-                    if os.path.isfile(ffmpeg_path):
+                    # (but only look inside it if the main script folder actually has one)
+                    ffmpeg_path = os.path.join(main_script_dir, '_internal', ffmpeg_executable)
+                    if '_internal' in main_script_dir_entries \
+                            and main_script_dir_entries['_internal'].is_dir() \
+                            and os.path.isfile(ffmpeg_path):
                         logger.debug('Found FFmpeg in _internal directory.')
                         os.environ['FFMPEG_BINARY'] = ffmpeg_path
 
@@ -603,21 +933,42 @@ class StoryToolkitAI:
                 logger.debug('FFMPEG_BINARY environment variable not set. Trying to execute "FFmpeg".')
                 ffmpeg_binary = 'ffmpeg'
 
-            cmd = [ffmpeg_binary]
-
             logger.debug('Checking ffmpeg binary: {}'.format(ffmpeg_binary))
 
-            # check if ffmpeg answers the call
-            exit_code = subprocess.call(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            ffmpeg_stat = None
+
+            # if we have the full path to the binary, it's enough to see if it's an executable file
+            # (a single stat tells us both, and we can reuse its mtime for the cache below)
+            if os.path.isabs(ffmpeg_binary):
+                try:
+                    ffmpeg_stat = os.stat(ffmpeg_binary)
+                except OSError:
+                    pass
+
+                # (Windows doesn't have executable permissions)
+                ffmpeg_works = ffmpeg_stat is not None and stat.S_ISREG(ffmpeg_stat.st_mode) \
+                    and (_IS_WIN or bool(ffmpeg_stat.st_mode & 0o111))
+
+            # otherwise check if ffmpeg answers the call
+            # (with -version, so that it exits right away without printing the whole help banner)
+            else:
+                exit_code = subprocess.run([ffmpeg_binary, '-version'], timeout=5,
+                                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode
 
-            logger.debug('FFmpeg exit code: {}'.format(exit_code))
+                logger.debug('FFmpeg exit code: {}'.format(exit_code))
 
-            if exit_code == 1:
+                ffmpeg_works = exit_code == 0
+
+            if ffmpeg_works:
                 logger.debug('FFmpeg found at {}'.format(ffmpeg_binary))
 
                 # add it to the PATH for this session so that we can use it
-                os.environ['FFMPEG_BINARY'] = ffmpeg_binary
-                os.environ['PATH'] += os.pathsep + os.path.dirname(ffmpeg_binary)
+                StoryToolkitAI._use_ffmpeg_binary(ffmpeg_binary)
+
+                # and remember it for the next session
+                # (unless it came from the app settings, which are always checked first anyway)
+                if ffmpeg_path_custom is None and ffmpeg_stat is not None:
+                    StoryToolkitAI._cache_ffmpeg_binary(ffmpeg_cache_key, ffmpeg_binary, ffmpeg_stat.st_mtime)
 
             else:
                 logger.error('FFmpeg not found on this machine. '
@@ -627,7 +978,7 @@ class StoryToolkitAI:
             # if it does, just return true
             return True
 
-        except FileNotFoundError:
+        except (FileNotFoundError, subprocess.TimeoutExpired):
             logger.error('FFmpeg not found on this machine. '
                          'Reading of certain audio and video files will not work. Please install it and try again.')
 
@@ -690,14 +1041,18 @@ class StoryToolkitAI:
             # connect to API using sockets, ssl and user and token
             self.api = socket.create_connection((host, port))
 
+            # our commands are small and each one waits for its response,
+            # so send them right away instead of letting Nagle's algorithm hold them back
+            self.api.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
             # wrap the socket in an SSL context
             # self.api = ssl.wrap_socket(self.api, ssl_version=ssl.PROTOCOL_TLSv1_2)
 
             # send the username and token to the API
-            self.api.send(bytes('login:{}:{}'.format(self.api_user, self.api_key), 'utf-8'))
+            self.api.sendall(bytes('login:{}:{}'.format(self.api_user, self.api_key), 'utf-8'))
 
             # get the response from the API
-            response = self.api.recv(1024).decode('utf-8')
+            response = self._recv_API_response()
 
             # if the response is not 'ok', return False
             if response != 'ok':
@@ -707,13 +1062,8 @@ class StoryToolkitAI:
             logger.info('API authenticated')
             self.api_connected = True
 
-            while True:
-                # ping the server every 2 seconds
-                time.sleep(2)
-                self.send_API_command(command='ping')
-
-            # send the ping command
-            # self.send_API_command(command='transcribe:file_path')
+            # keep pinging the server in the background
+            Thread(target=self._ping_API, daemon=True).start()
 
             return True
 
@@ -723,6 +1073,27 @@ class StoryToolkitAI:
             self.api_connected = False
             return False
 
+    def _recv_API_response(self):
+        """
+        This reads a response from the API socket into the receive buffer and returns it as a string
+        """
+
+        received_bytes = self.api.recv_into(self._api_recv_view)
+
+        return self._api_recv_buffer[:received_bytes].decode('utf-8')
+
+    def _ping_API(self):
+        """
+        This pings the API server every 2 seconds, for as long as we're connected
+        (meant to be run in a separate thread, see connect_API)
+        """
+
+        while self.api_connected:
+            time.sleep(2)
+
+            if self.send_API_command(command='ping') is False:
+                self.api_connected = False
+
     def send_API_command(self, command):
 
         if self.api is None:
@@ -730,10 +1101,11 @@ class StoryToolkitAI:
             return False
 
         try:
-            self.api.send(bytes(command, 'utf-8'))
-            logger.debug('Sending command to API: {}'.format(command))
+            with self._api_lock:
+                self.api.sendall(bytes(command, 'utf-8'))
+                logger.debug('Sending command to API: {}'.format(command))
 
-            response = self.api.recv(1024).decode('utf-8')
+                response = self._recv_API_response()
 
             logger.debug('Received response from API: {}'.format(response))
             return response
@@ -1,11 +1,8 @@
-import openai
-import tiktoken
-import hashlib
-import time
-from openai import OpenAI
+import uuid
 import json
 import os
 import copy
+import functools
 import requests
 from pydantic import BaseModel, root_validator
 from typing import Optional
@@ -14,6 +11,23 @@ from storytoolkitai.core.logger import logger
 from storytoolkitai import USER_DATA_PATH
 
 
+@functools.lru_cache(maxsize=16)
+def get_encoding(model):
+    """
+    This returns the tiktoken encoding for the model
+    (cached, so that we don't have to look it up each time we calculate the tokens for the same model)
+    """
+
+    # tiktoken is only imported when we actually need it, since it takes a while to import
+    import tiktoken
+
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        logger.warning("Model name not found when calculating tokens. Using cl100k_base encoding.")
+        return tiktoken.get_encoding("cl100k_base")
+
+
 class ToolkitAssistant:
     """
     This is the main class for the assistant
@@ -71,6 +85,9 @@ class ChatGPT(ToolkitAssistant):
     and results between UI and whatever assistant model / API we're using
     """
 
+    # the app setting that holds the API key for this type of assistant (if none was passed)
+    api_key_setting_name = 'openai_api_key'
+
     def __init__(self, model_provider, model_name, **kwargs):
 
         super().__init__(toolkit_ops_obj=kwargs.get('toolkit_ops_obj', None))
@@ -82,16 +99,26 @@ class ChatGPT(ToolkitAssistant):
         self.model_name = model_name
 
         # generate a unique ID for the assistant
-        self._assistant_id = hashlib.md5((str(self.model_name) + str(time.time)).encode('utf-8')).hexdigest()
+        self._assistant_id = uuid.uuid4().hex
 
         # store the number of tokens used for the assistant
         # this is a list containing the in and out tokens [in, out]
         self._tokens_used = [0, 0]
 
+        # the token counts of the chat history strings from the last calculate_history_tokens call
+        # so that only new or changed messages need to be encoded again
+        self._history_tokens_cache = dict()
+
+        # the model info doesn't change during the lifetime of the assistant, so we only look it up once
+        self._info = LLM_AVAILABLE_MODELS.get(self.model_provider, {}).get(self.model_name, None)
+
+        if self._info is None:
+            logger.warning('Info for model {} unavailable or incomplete.'.format(self.model_name))
+
         # the price per 1000 tokens
         # this should be a list containing the price for in and out tokens and the currency
         # for eg: [0.01, 0.03, 'USD']
-        self._model_price = self.model_price
+        self._model_price = self._get_model_price()
 
         # start the chat history, if none was passed, then start with an empty list
         self.chat_history = list() if kwargs.get('chat_history', None) is None else kwargs.get('chat_history', None)
@@ -117,11 +144,33 @@ class ChatGPT(ToolkitAssistant):
             self.add_context(self.context)
 
         # get the API key from the kwargs or config
-        self.api_key \
-            = kwargs.get('api_key', self.stAI.get_app_setting(setting_name='openai_api_key', default_if_none=None))
+        # (only read the setting if no key was passed)
+        self.api_key = kwargs['api_key'] if 'api_key' in kwargs \
+            else self.stAI.get_app_setting(setting_name=self.api_key_setting_name, default_if_none=None)
 
         self.base_url = kwargs.get('base_url', None)
 
+        # the OpenAI client is created on the first request and then reused (see _get_client)
+        self._client = None
+        self._client_settings = None
+
+    def _get_client(self):
+        """
+        This returns the OpenAI client for this assistant
+        (reusing it keeps the connection to the API alive between requests)
+        """
+
+        # create a new client only if we don't have one or if the key or url have changed since
+        if self._client is None or self._client_settings != (self.api_key, self.base_url):
+
+            # openai is only imported when we actually need it, since it takes a while to import
+            from openai import OpenAI
+
+            self._client = OpenAI(api_key=self.api_key, base_url=self.base_url)
+            self._client_settings = (self.api_key, self.base_url)
+
+        return self._client
+
     def reset(self):
         """
         This function is used to reset the assistant, by clearing the chat history,
@@ -149,20 +198,8 @@ class ChatGPT(ToolkitAssistant):
 
         # first, make sure this is the first message in the chat history
         # by removing any other system messages
-        system_message_idx = []
-        for i, message in enumerate(self.chat_history):
-
-            # if the role is system, then we've found the system message
-            if message['role'] == 'system':
-
-                # remember the index of the system message
-                # we can't do it here since we're iterating over the list
-                system_message_idx.append(i)
-
-        # if we found any system messages, remove them
-        if system_message_idx:
-            for i in system_message_idx:
-                self.chat_history.pop(i)
+        # (in one pass and in place, in case anyone else holds a reference to the chat history list)
+        self.chat_history[:] = [message for message in self.chat_history if message['role'] != 'system']
 
         # and now re-add the new system message on top
         self.chat_history.insert(0, {"role": "system", "content": system_message})
@@ -262,11 +299,7 @@ class ChatGPT(ToolkitAssistant):
         if messages is None:
             messages = self.chat_history
 
-        try:
-            encoding = tiktoken.encoding_for_model(model)
-        except KeyError:
-            logger.warning("Model name not found when calculating tokens. Using cl100k_base encoding.")
-            encoding = tiktoken.get_encoding("cl100k_base")
+        encoding = get_encoding(model)
 
         if model in {
             "gpt-3.5-turbo-0613",
@@ -295,15 +328,32 @@ class ChatGPT(ToolkitAssistant):
             logger.error("Cannot accurately calculate tokens for model {}. Returning None.".format(model))
             return None
 
+        # only keep the token counts of the strings that are still in the history
+        history_tokens_cache = dict()
+
+        # encode all the strings we haven't seen before (with the same encoding) in one batch
+        # (encode_batch spreads the work over multiple threads)
+        new_values = list({value for message in messages for value in message.values()
+                           if (encoding.name, value) not in self._history_tokens_cache})
+        for value, value_encoded in zip(new_values, encoding.encode_batch(new_values)):
+            history_tokens_cache[(encoding.name, value)] = len(value_encoded)
+
         num_tokens = 0
         for message in messages:
             num_tokens += tokens_per_message
             for key, value in message.items():
-                num_tokens += len(encoding.encode(value))
+
+                cache_key = (encoding.name, value)
+                if cache_key not in history_tokens_cache:
+                    history_tokens_cache[cache_key] = self._history_tokens_cache[cache_key]
+
+                num_tokens += history_tokens_cache[cache_key]
                 if key == "name":
                     num_tokens += tokens_per_name
         num_tokens += 3  # every reply is primed with <|start|>assistant<|message|>
 
+        self._history_tokens_cache = history_tokens_cache
+
         return num_tokens
 
     def add_usage(self, *, tokens_in=0, tokens_out=0):
@@ -319,20 +369,17 @@ class ChatGPT(ToolkitAssistant):
         self._tokens_used[1] += tokens_out
 
         # but also keep track of the total usage of this model since the tool was started
-        # we use the assistant id but also the model name and provider
-        # so that we can calculate the usage correctly per model type
+        # we use the model name and provider so that we can calculate the usage correctly per model type
+        # (add only this call's tokens, since other assistants may be using the same model)
+        usage_key = 'assistant_usage__{}__{}'.format(self.model_provider, self.model_name)
 
         # tokens in
         self.stAI.update_statistics(
-            'assistant_usage__{}__{}_in'.format(self.model_provider, self.model_name),
-            self._tokens_used[0]
-        )
+            usage_key + '_in', (self.stAI.read_statistics(usage_key + '_in') or 0) + tokens_in)
 
         # tokens out
         self.stAI.update_statistics(
-            'assistant_usage__{}__{}_out'.format(self.model_provider, self.model_name),
-            self._tokens_used[1]
-        )
+            usage_key + '_out', (self.stAI.read_statistics(usage_key + '_out') or 0) + tokens_out)
 
         # print(self.stAI.statistics)
 
@@ -342,12 +389,13 @@ class ChatGPT(ToolkitAssistant):
         if settings is None:
             settings = dict()
 
+        # we need this for the openai exceptions below
+        import openai
+
         # now send the query to the assistant
         try:
 
-            client = OpenAI(api_key=self.api_key, base_url=self.base_url)
-
-            response = client.chat.completions.create(
+            response = self._get_client().chat.completions.create(
                 model=self.model_name,
                 messages=chat_history,
                 temperature=settings.get('temperature', 1),
@@ -370,7 +418,7 @@ class ChatGPT(ToolkitAssistant):
                     self._last_assistant_message_idx = len(self.chat_history) - 1
 
             # add the usage
-            self.add_usage(tokens_in=response.usage.completion_tokens, tokens_out=response.usage.prompt_tokens)
+            self.add_usage(tokens_in=response.usage.prompt_tokens, tokens_out=response.usage.completion_tokens)
 
             # wrap the response in an AssistantResponse object
             # so we can process it correctly
@@ -472,24 +520,26 @@ class ChatGPT(ToolkitAssistant):
         """
 
         try:
-            return LLM_AVAILABLE_MODELS[self.model_provider][self.model_name]['description']
+            return self._info['description']
 
-        except KeyError:
+        except (KeyError, TypeError):
             return '{} (unknown model)'.format(self.model_name)
 
     @property
     def model_price(self):
+        return self._model_price
+
+    def _get_model_price(self):
 
         try:
-            price = self.info['price']
+            price = self._info['price']
 
             # the price should be a dict with input, output and currency
-            self._model_price = price['input'], price['output'], price['currency']
-            return self._model_price
+            return price['input'], price['output'], price['currency']
 
         except TypeError:
             # if the price is not a dict, then it's probably None
-            # and it's probably already been logged in the info function
+            # and it's probably already been logged when the info was looked up
             return None
 
         except KeyError:
@@ -511,11 +561,7 @@ class ChatGPT(ToolkitAssistant):
 
     @property
     def info(self):
-        try:
-            return LLM_AVAILABLE_MODELS[self.model_provider][self.model_name]
-        except KeyError:
-            logger.warning('Info for model {} unavailable or incomplete.'.format(self.model_name))
-            return None
+        return self._info
 
     @property
     def available_models(self):
@@ -539,14 +585,13 @@ class StAssistantRequest(BaseModel):
 
 class StAssistant(ChatGPT):
 
+    # the storytoolkit.ai assistants use the StoryToolkitAI API key
+    api_key_setting_name = 'stai_api_key'
+
     def __init__(self, model_provider, model_name, **kwargs):
 
         super().__init__(model_provider=model_provider, model_name=model_name, **kwargs)
 
-        # get the API key from the kwargs or the config
-        self.api_key \
-            = kwargs.get('api_key', self.stAI.get_app_setting(setting_name='stai_api_key', default_if_none=None))
-
         # use the base_url from the config if it exists or the default one
         self.base_url = kwargs.get('base_url', 'https://api.storytoolkit.ai')
 
@@ -623,7 +668,7 @@ class StAssistant(ChatGPT):
                 self._last_assistant_message_idx = len(self.chat_history) - 1
 
             # add the result to the chat history
-            self.add_usage(tokens_in=response.usage.completion_tokens, tokens_out=response.usage.prompt_tokens)
+            self.add_usage(tokens_in=response.usage.prompt_tokens, tokens_out=response.usage.completion_tokens)
 
             # wrap the response in an AssistantResponse object
             # so we can process it correctly
@@ -684,7 +729,7 @@ class AssistantUtils:
                 raise KeyError
 
             # check if the model is in the available models from the provider
-            provider_models = AssistantUtils.assistant_available_models(provider=model_provider)
+            provider_models = LLM_AVAILABLE_MODELS[model_provider]
 
             # if the model name is not in the available models
             if model_name not in provider_models:
@@ -701,23 +746,19 @@ class AssistantUtils:
 
                 # if we still couldn't find the model, then just use the first available model from the provider
                 if model_name not in provider_models:
-                    model_name = provider_models[0]
+                    model_name = next(iter(provider_models))
                     logger.warning('Selected first available model from the provider: {}')
 
-            # load the assistant class
-            toolkit_assistant = LLM_AVAILABLE_MODELS[model_provider][model_name].get('handler', None)
+            # look up the model info only once
+            model_info = provider_models[model_name]
 
-            # use the base_url from the config if it exists
-            if LLM_AVAILABLE_MODELS[model_provider][model_name].get('base_url', None):
-                kwargs['base_url'] = LLM_AVAILABLE_MODELS[model_provider][model_name]['base_url']
-
-            # use the api_key from the config if it exists
-            if LLM_AVAILABLE_MODELS[model_provider][model_name].get('api_key', None):
-                kwargs['api_key'] = LLM_AVAILABLE_MODELS[model_provider][model_name]['api_key']
+            # load the assistant class
+            toolkit_assistant = model_info.get('handler', None)
 
-            # use the system_message from the config if it exists
-            if LLM_AVAILABLE_MODELS[model_provider][model_name].get('system_message', None):
-                kwargs['system_message'] = LLM_AVAILABLE_MODELS[model_provider][model_name]['system_message']
+            # use the base_url, api_key and system_message from the config if they exist
+            for model_setting in ('base_url', 'api_key', 'system_message'):
+                if model_info.get(model_setting, None):
+                    kwargs[model_setting] = model_info[model_setting]
 
             if isinstance(toolkit_assistant, str):
                 # if the handler is a string, try to use it as a class name
@@ -749,7 +790,7 @@ class AssistantUtils:
 
             # select the first provider if the provider is not in the available models
             if provider not in LLM_AVAILABLE_MODELS:
-                provider = list(LLM_AVAILABLE_MODELS.keys())[0]
+                provider = next(iter(LLM_AVAILABLE_MODELS))
 
             return list(LLM_AVAILABLE_MODELS[provider].keys())
         else:
@@ -80,7 +80,8 @@ class Document:
 
     @staticmethod
     def get_document_path_id(document_file_path: str = None):
-        return hashlib.md5(document_file_path.encode('utf-8')).hexdigest()
+        # only used to identify the document during runtime, so a short blake2s digest is enough
+        return hashlib.blake2s(document_file_path.encode('utf-8'), digest_size=8).hexdigest()
 
     def load_from_file(self, file_path):
         """
@@ -3,6 +3,7 @@ import cv2
 from moviepy.editor import VideoFileClip, AudioFileClip
 import subprocess
 import re
+import functools
 
 from storytoolkitai.core.toolkit_ops.videoanalysis import ClipIndex
 from storytoolkitai.core.logger import logger
@@ -98,13 +99,7 @@ class MediaItem:
         Checks if the file has audio and returns True if it does, otherwise returns False.
         """
 
-        try:
-            audio_clip = AudioFileClip(file_path)
-            audio_present = audio_clip.duration > 0
-        except Exception:
-            audio_present = False
-
-        return audio_present
+        return 'audio' in MediaUtils.get_stream_types(file_path)
 
     @staticmethod
     def has_video(file_path):
@@ -112,13 +107,7 @@ class MediaItem:
         Checks if the file has video and returns True if it does, otherwise returns False.
         """
 
-        try:
-            clip = VideoFileClip(file_path)
-            video_present = clip.reader.nframes > 0
-        except Exception:
-            video_present = False
-
-        return video_present
+        return 'video' in MediaUtils.get_stream_types(file_path)
 
     def get_media_type(self):
         """
@@ -168,6 +157,12 @@ class VideoItem(MediaItem, ClipIndex):
 
         self._timecode_data = None
 
+        # the video capture is opened on the first get_video_frame call and then reused for the next frames
+        self._video_capture = None
+
+        # the index of the next frame that the video capture will read (if we don't seek)
+        self._next_frame_index = None
+
     def get_timecode_data(self):
         """
         Returns the timecode data of the video item.
@@ -183,22 +178,90 @@ class VideoItem(MediaItem, ClipIndex):
 
     def get_video_frame(self, frame_index: int):
         """
-        Returns the video frame at the given frame index.
+        Returns the video frame at the given frame index (the first frame is 1).
         """
 
-        cap = cv2.VideoCapture(self.source_path)
+        # open the video only once and keep it open for the next frames
+        if self._video_capture is None or not self._video_capture.isOpened():
+            self._video_capture = cv2.VideoCapture(self.source_path)
+            self._next_frame_index = 0
+
+        # seeking is expensive (it decodes from the previous keyframe),
+        # so only do it if we're not reading the frames in order
+        if frame_index - 1 != self._next_frame_index:
+            self._video_capture.set(cv2.CAP_PROP_POS_FRAMES, frame_index - 1)
+
+        ret, frame = self._video_capture.read()
 
-        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index - 1)
-        ret, frame = cap.read()
+        # if the read failed, we don't know where the capture is, so seek the next time
+        self._next_frame_index = frame_index if ret else None
 
         # Return the frame if it was read correctly, otherwise return None
         return frame if ret else None
 
-    ClipIndex = ClipIndex
+    def close(self):
+        """
+        Releases the video file (if it was opened for reading frames)
+        """
+
+        # (the item might not have been fully initialized, if we're called from __del__)
+        if getattr(self, '_video_capture', None) is not None:
+            self._video_capture.release()
+            self._video_capture = None
+            self._next_frame_index = None
+
+    def __del__(self):
+        self.close()
 
 
 class MediaUtils:
 
+    @staticmethod
+    def get_stream_types(file_path):
+        """
+        This returns the types of streams found in the file (for eg. {'audio', 'video'})
+        or an empty set if the file can't be read
+        """
+
+        try:
+            # the file modification time is part of the cache key,
+            # so we probe the file again if it changed
+            return MediaUtils._probe_stream_types(file_path, os.path.getmtime(file_path))
+
+        # (ValueError and TypeError cover invalid paths, for eg. None or paths with null characters)
+        except (OSError, ValueError, TypeError):
+            return frozenset()
+
+    @staticmethod
+    @functools.lru_cache(maxsize=128)
+    def _probe_stream_types(file_path, file_mtime):
+        """
+        This uses ffmpeg to find out which types of streams are in the file
+        (a single ffmpeg call which only reads the file header, so we don't need to open the whole clip)
+        """
+
+        # ffmpeg writes UTF-8 (file names, metadata etc.), no matter what the locale encoding is (for eg. on Windows),
+        # so decode it as such, and don't fail on anything that can't be decoded
+        try:
+            cmd = ["ffmpeg", "-i", file_path, "-hide_banner"]
+            result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                    encoding='utf-8', errors='replace')
+
+        except (OSError, ValueError):
+            logger.error('Could not run ffmpeg to probe {}.'.format(file_path), exc_info=True)
+            return frozenset()
+
+        stream_types = set()
+        for stream_match in re.finditer(r"Stream #\S+: (Audio|Video): (.*)", result.stderr):
+
+            # cover art (in audio files, for eg.) shows up as a video stream, but it's not a video
+            if stream_match.group(1) == 'Video' and '(attached pic)' in stream_match.group(2):
+                continue
+
+            stream_types.add(stream_match.group(1).lower())
+
+        return frozenset(stream_types)
+
     @staticmethod
     def get_audio_sample_rate(file):
         """
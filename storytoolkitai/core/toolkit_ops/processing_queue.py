@@ -1,11 +1,12 @@
 import time
 import json
+import itertools
 
 from storytoolkitai import USER_DATA_PATH
 from storytoolkitai.core.logger import *
 
 import torch
-from threading import Thread
+from threading import Thread, RLock
 
 
 QUEUE_FILE_PATH = os.path.join(USER_DATA_PATH, 'queue.json')
@@ -41,6 +42,14 @@ class ProcessingQueue:
         # the key is the queue id and the value is a dict variable names and values
         self.queue_variables = {}
 
+        # the queue is pinged both from the UI thread (when adding items) and from the worker threads
+        # (when they finish), so we use this lock to make sure that only one ping dispatches items at a time
+        # - otherwise two pings could start the same item or put two items on the same device
+        self._ping_lock = RLock()
+
+        # this is used when generating queue ids to make sure they're unique within this session
+        self._queue_id_counter = itertools.count()
+
         # how much to wait until checking if there are items in the queue that can be processed
         # disabled for now - if we activate this we need to make sure that the device is not used by another thread
         # by checking the queue_threads dict
@@ -54,9 +63,10 @@ class ProcessingQueue:
         # keep generating a queue id until it's not similar to one that already exists in the queue history
         while True:
 
-            # use the name if one was provided
-            # and a timestamp to make it as unique as possible
-            queue_id = "{}{}".format(((name.replace(' ', '') + '-') if name else ''), time.time())
+            # use the name if one was provided, a timestamp
+            # and a counter so that ids generated within the same clock tick are still unique
+            queue_id = "{}{}-{}".format(((name.replace(' ', '') + '-') if name else ''),
+                                        time.time_ns(), next(self._queue_id_counter))
 
             # if the queue id doesn't return an item
             if not self.get_item(queue_id=queue_id):
@@ -201,10 +211,6 @@ class ProcessingQueue:
         # save the queue to a file
         self.save_queue_to_file()
 
-        # throttle for a bit to avoid queue id queue id collisions,
-        # if this is a batch
-        time.sleep(0.01)
-
         # return the queue id if we reached this point
         return queue_id
 
@@ -825,7 +831,15 @@ class ProcessingQueue:
 
     def ping_queue(self):
         """
-        Checks if there are items left in the queue and executes the first one if there are
+        Checks if there are items left in the queue and starts the first one that can start on each available device
+        """
+
+        with self._ping_lock:
+            return self._ping_queue()
+
+    def _ping_queue(self):
+        """
+        This does the actual queue ping (see ping_queue)
         """
 
         # if there are no items in the queue, return False
@@ -833,82 +847,54 @@ class ProcessingQueue:
             logger.debug('No items left in the queue. Try to ping the queue again later.')
             return False
 
-        # get the first item in the queue
+        started = False
+
+        # go through the queue and try to start the items in order,
+        # but don't let an item that waits for a busy device block the items that use other (available) devices
         queue_index = 0
-        queue_id = self.queue[queue_index]
-        reorder_queue = False
+        while queue_index < len(self.queue):
 
-        # try to start the next item from the queue that can be started
-        while not (can_start := self._item_can_start(queue_id=queue_id)):
+            queue_id = self.queue[queue_index]
 
-            logger.debug('Item {} cannot start. Trying the next one.'.format(queue_id))
+            can_start = self._item_can_start(queue_id=queue_id)
 
             # if we received a None from _item_can_start,
-            # it means that the item doesn't exist anymore relative to when we started the loop
+            # it means that the item was removed from the queue
             # so we shouldn't increment the queue index
-            if can_start is not None:
-                # add +1 to the queue index
-                queue_index += 1
-
-            # check if the queue index is out of range
-            if queue_index >= len(self.queue):
-                # and abort if it is
-                if len(self.queue) == 0:
-                    logger.debug("Queue is empty.")
-                else:
-                    logger.debug('None of the queue items are ready to start. Try again later.')
-                return False
-
-            # get the next item in the queue
-            queue_id = self.queue[queue_index]
-
-
+            if can_start is None:
+                continue
 
-        # todo: fix this
-        """
-        # try to see if we can start this item
-        # and loop through the queue until we find one that we can start
-        # or until we reach the end of the queue
-        # todo: update the item status to failed if we get a None returned from _item_can_start
-        while not self._item_can_start(queue_id=queue_id):
-
-            # add +1 to the queue index
-            queue_index += 1
-
-            # and try again (if the queue index is out of range, this will return False)
-            if queue_index >= len(self.queue):
-                logger.debug('Left queue items not ready to start. Try again later.')
-                return False
+            if not can_start:
+                logger.debug('Item {} cannot start. Trying the next one.'.format(queue_id))
+                queue_index += 1
+                continue
 
-            # get the next item in the queue
-            queue_id = self.queue[queue_index]
+            # get the item details from the queue history
+            kwargs = self.get_item(queue_id=queue_id)
 
-            # mark that we need to reorder the queue
-            reorder_queue = True
+            # check if the device is available
+            if not self.is_device_available(device=kwargs['device']):
+                logger.debug('Device {} busy. Trying the next item.'.format(kwargs['device']))
+                queue_index += 1
+                continue
 
-        # make sure that we re-order the queue
-        if reorder_queue:
+            # this also removes the item from the queue, so the queue index stays the same
+            self._start_item(queue_id=queue_id, kwargs=kwargs)
 
-            # first get the old order
-            # (use a copy of the list to avoid changing the original list due to mutability)
-            new_queue_order = [queue_id for queue_id in self.queue]
+            started = True
 
-            # then remove the item from the old order (from whatever position it was in)
-            new_queue_order.pop(queue_index)
+        if not started:
+            if len(self.queue) == 0:
+                logger.debug("Queue is empty.")
+            else:
+                logger.debug('None of the queue items are ready to start. Try again later.')
 
-            # and add it back to the beginning of the list
-            new_queue_order.insert(0, queue_id)
+        return started
 
-            self.reorder_queue(new_queue_order=new_queue_order)
+    def _start_item(self, queue_id, kwargs):
+        """
+        This starts the thread that executes the tasks of a queue item and removes the item from the queue
         """
-
-        # get the item details from the queue history
-        kwargs = self.get_item(queue_id=queue_id)
-
-        # check if the device is available
-        if not self.is_device_available(device=kwargs['device']):
-            logger.debug('Device busy. Try again later.')
-            return False
 
         # check all the kwargs and make sure that all their keys are strings
         # otherwise the thread will fail to start
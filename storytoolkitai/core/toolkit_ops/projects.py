@@ -1,15 +1,16 @@
 import os
-import codecs
+import stat
 import json
-import copy
 import time
 import shutil
 import hashlib
+import functools
 
-from threading import Timer
+from threading import Timer, Lock
 
 from storytoolkitai import USER_DATA_PATH
 from storytoolkitai.core.logger import logger
+from storytoolkitai.core import json_utils
 
 PROJECTS_PATH = os.path.join(os.path.join(USER_DATA_PATH, 'projects'))
 
@@ -24,22 +25,43 @@ def get_projects_from_path(projects_path=PROJECTS_PATH):
     if projects_path is None:
         projects_path = PROJECTS_PATH
 
+    # get the list of projects in the projects path, together with the last modified time of their project files
+    # a valid project is a directory with a project.json file in it (just like in Project.load_from_path),
+    # so we don't need to load each project to find out if it's valid
+    projects = []
+    try:
+        # (scandir already knows which entries are directories, so we don't need to stat the other files)
+        with os.scandir(projects_path) as entries:
+            for entry in entries:
+
+                if not entry.is_dir():
+                    continue
+
+                # a single stat tells us if the project file exists and when it was last modified
+                try:
+                    project_file_stat = os.stat(os.path.join(entry.path, 'project.json'))
+                except OSError:
+                    continue
+
+                if stat.S_ISREG(project_file_stat.st_mode):
+                    projects.append((entry.name, project_file_stat.st_mtime))
+
     # if the projects path doesn't exist, return an empty list
-    if not os.path.exists(projects_path):
+    except FileNotFoundError:
         return []
 
-    # get the list of projects in the projects path
-    projects = [f for f in os.listdir(projects_path) if Project(project_name=f).exists]
-
     # sort by last modified
-    projects.sort(key=lambda x: os.path.getmtime(os.path.join(projects_path, x, 'project.json')), reverse=True)
+    projects.sort(key=lambda project: project[1], reverse=True)
 
-    # return the list of projects
-    return projects
+    # return the list of project names
+    return [project_name for project_name, _ in projects]
 
 
 class Project:
 
+    # how many seconds save_soon can postpone a save at most while the project keeps changing
+    _save_max_deferral = 15
+
     _instances = {}
 
     def __new__(cls, **kwargs):
@@ -96,6 +118,9 @@ class Project:
         # the project path must be a directory
         self._project_path = project_path
 
+        # the id of this instance in the instances dict (see __new__)
+        self._project_path_id = self.get_project_path_id(project_path)
+
         self._name = None
         self._last_target_dir = None
 
@@ -103,13 +128,14 @@ class Project:
         self._timelines = {}
 
         # these store the paths to the linked transcriptions
-        self._transcriptions = []
+        # (the linked paths are kept in sets, so we can quickly check if something is linked or not)
+        self._transcriptions = set()
 
         # these store the paths to the linked stories
-        self._stories = []
+        self._stories = set()
 
         # these store the paths to the linked documents
-        self._documents = []
+        self._documents = set()
 
         # we use this to keep track if we updated, deleted, added, or changed anything
         self._dirty = False
@@ -117,6 +143,9 @@ class Project:
         # this is used to keep track of the last time the project was saved
         self._last_save_time = None
 
+        # the digest of the last project data written to the file, so we don't write the same data again
+        self._last_saved_digest = None
+
         # if the load was unsuccessful, we mark the project as dirty so that it will be saved
         if not self.load_from_path(project_path=self._project_path):
             self._dirty = True
@@ -131,11 +160,19 @@ class Project:
         # this way, we don't create another timer if one is already running and the save_soon method is called again
         self._save_timer = None
 
-        # if we're saving very often, we can throttle the save timer
-        # the throttle is a ratio used to multiply the save timer interval
-        # the more often we save, the longer the interval between saves
-        # but then this is reset to 1 when we're not saving often
-        self._save_timer_throttle = 1
+        # when the save timer should save the project (monotonic time)
+        # each save_soon call only pushes this further, instead of starting another timer
+        self._save_deadline = 0
+
+        # when the first of the pending save requests was made (monotonic time),
+        # so that we don't keep postponing the save forever if the project changes all the time
+        self._save_requested_at = None
+
+        # the arguments passed to the _save method when the save timer executes
+        self._save_kwargs = {}
+
+        # this protects the save timer related attributes above
+        self._save_timer_lock = Lock()
 
         # add this to know that we already initialized this instance
         self._initialized = True
@@ -158,15 +195,15 @@ class Project:
 
     @property
     def transcriptions(self):
-        return self._transcriptions
+        return sorted(self._transcriptions) if self._transcriptions is not None else None
 
     @property
     def stories(self):
-        return self._stories
+        return sorted(self._stories) if self._stories is not None else None
 
     @property
     def documents(self):
-        return self._documents
+        return sorted(self._documents) if self._documents is not None else None
 
     @property
     def is_dirty(self):
@@ -189,6 +226,12 @@ class Project:
 
     __known_attributes = ['name', 'last_target_dir', 'timelines', 'transcriptions', 'stories', 'documents']
 
+    # these attributes hold the paths of the linked files (they're sets in the object, but lists in the project file)
+    __linked_attributes = ['transcriptions', 'stories', 'documents']
+
+    # the attributes that hold the linked paths of each object type
+    __linked_object_types = {'transcription': '_transcriptions', 'story': '_stories', 'document': '_documents'}
+
     def set(self, key: str or dict, value=None, save_soon=False):
         """
         We use this to set some of the attributes of the transcription.
@@ -209,6 +252,10 @@ class Project:
         # if the key is a string and is allowed, do this:
         if key in self.__known_attributes:
 
+            # the linked paths are stored as sets
+            if key in self.__linked_attributes and value is not None:
+                value = set(value)
+
             # if the attribute is different from the current value
             if getattr(self, '_' + key) != value:
 
@@ -229,8 +276,7 @@ class Project:
 
                     # if the new project path is different from the old project path
                     if new_project_path == old_project_path:
-                        logger.debug('Cannot rename project to "{}" '
-                                     '- the new name is the same as the old name.'.format(value))
+                        logger.debug('Cannot rename project to "%s" - the new name is the same as the old name.', value)
                         return False
 
                     # if the new project path already exists, we can't rename the project
@@ -241,12 +287,16 @@ class Project:
                     # rename the project folder
                     os.rename(old_project_path, new_project_path)
 
+                    # the project file is somewhere else now, so make sure that the next save writes it
+                    self._last_saved_digest = None
+
                     # set the project path to the new project path
                     self._project_path = new_project_path
 
                     # recalculate the project path id and update the instances dict
-                    del self.__class__._instances[self.get_project_path_id(old_project_path)]
-                    self.__class__._instances[self.get_project_path_id(self._project_path)] = self
+                    del self.__class__._instances[self._project_path_id]
+                    self._project_path_id = self.get_project_path_id(self._project_path)
+                    self.__class__._instances[self._project_path_id] = self
 
             return True
 
@@ -262,15 +312,15 @@ class Project:
 
         # for a project path to be valid, it must be a directory and have a project.json file in it
         if not os.path.isdir(project_path):
-            logger.debug("Project path {} is not a directory".format(project_path))
+            logger.debug('Project path %s is not a directory', project_path)
             return False
 
         project_json_path = os.path.join(project_path, 'project.json')
         if not os.path.isfile(project_json_path):
-            logger.debug("Project file {} does not exist".format(project_json_path))
+            logger.debug('Project file %s does not exist', project_json_path)
             return False
 
-        logger.debug("Loading project from {}".format(project_path))
+        logger.debug('Loading project from %s', project_path)
 
         self._project_path = project_path
 
@@ -284,12 +334,8 @@ class Project:
         project_json_path = os.path.join(self._project_path, 'project.json')
 
         try:
-            with codecs.open(project_json_path, 'r', 'utf-8-sig') as json_file:
-                self._data = json.load(json_file)
-
-                # let's make a deep copy of the data
-                # so that we can manipulate it without changing the original data
-                self._data = copy.deepcopy(self._data)
+            # (json_utils also takes care of the UTF-8 BOM, if there is one)
+            self._data = json_utils.load_file(project_json_path)
 
         # in case we get JSONDecodeError, we assume that the file is not a valid JSON file
         except json.decoder.JSONDecodeError:
@@ -306,8 +352,12 @@ class Project:
         for attribute in self.__known_attributes:
 
             # if the attribute is in the data, set the attribute
+            # (but turn the lists of linked paths into sets)
             if attribute in self._data:
-                setattr(self, '_{}'.format(attribute), self._data[attribute])
+                if attribute in self.__linked_attributes and self._data[attribute] is not None:
+                    setattr(self, '_{}'.format(attribute), set(self._data[attribute]))
+                else:
+                    setattr(self, '_{}'.format(attribute), self._data[attribute])
 
             # if the attribute is not in the data, set the attribute to None
             else:
@@ -328,6 +378,10 @@ class Project:
             if hasattr(self, '_'+attribute) and getattr(self, '_'+attribute) is not None:
                 project_dict[attribute] = getattr(self, '_'+attribute)
 
+                # the linked paths are saved as sorted lists, so the project file doesn't change for no reason
+                if attribute in self.__linked_attributes:
+                    project_dict[attribute] = sorted(project_dict[attribute])
+
         return project_dict
 
     def save_soon(self, force=False, backup: bool or float = False, sec=3, **kwargs):
@@ -352,32 +406,55 @@ class Project:
         if sec == 0:
 
             # but first cancel the save timer if it's running
-            if self._save_timer is not None:
-                self._save_timer.cancel()
-                self._save_timer = None
+            with self._save_timer_lock:
+                if self._save_timer is not None:
+                    self._save_timer.cancel()
+                    self._save_timer = None
 
             return self._save(backup=backup)
 
-        # if we're calling this function again before the last save was done
-        # it means that we're calling this function more often so many changes might follow in our Project,
-        # so throttle the save timer for the next time to increase the time between saves
-        # also, because the last save didn't execute, we don't have to start another save timer
-        # since all changes will be saved when the existing save timer executes
-        if self._save_timer is not None:
-            # only increase the throttle if it's not already at the max
-            if self._save_timer_throttle < 3:
-                self._save_timer_throttle *= 1.05
-            return
-        else:
-            self._save_timer_throttle = 1
+        now = time.monotonic()
 
-        # calculate the throttled time
-        throttled_sec = sec * self._save_timer_throttle
+        with self._save_timer_lock:
 
-        kwargs = {**{'backup': backup}, **kwargs}
+            self._save_kwargs = {**{'backup': backup}, **kwargs}
 
-        self._save_timer = Timer(throttled_sec, self._save, kwargs=kwargs)
-        self._save_timer.start()
+            if self._save_timer is None:
+                self._save_requested_at = now
+
+            # if we're calling this function again before the last save was done,
+            # many changes might follow in our Project, so we only push the save a bit further,
+            # but never more than _save_max_deferral seconds after the first request
+            self._save_deadline = min(max(self._save_deadline, now + sec),
+                                      self._save_requested_at + self._save_max_deferral)
+
+            # the running save timer will take care of the new deadline when it executes
+            if self._save_timer is not None:
+                return
+
+            self._save_timer = Timer(self._save_deadline - now, self._save_when_due)
+            self._save_timer.start()
+
+    def _save_when_due(self):
+        """
+        This is called by the save timer and saves the project if the save deadline has passed,
+        otherwise it waits for the rest of the time until the deadline
+        """
+
+        with self._save_timer_lock:
+
+            remaining_sec = self._save_deadline - time.monotonic()
+
+            # if the deadline was pushed since the timer started, wait for the remaining time
+            if remaining_sec > 0:
+                self._save_timer = Timer(remaining_sec, self._save_when_due)
+                self._save_timer.start()
+                return
+
+            self._save_timer = None
+            save_kwargs = self._save_kwargs
+
+        return self._save(**save_kwargs)
 
     def _save(self, backup: bool or float = False,
               if_successful: callable = None, if_failed: callable = None, **kwargs):
@@ -394,36 +471,48 @@ class Project:
         # create the project data dict
         project_data = self.to_dict()
 
-        # use the project utils function to write the project to the file
-        save_result = ProjectUtils.write_to_project_file(
-            project_data=project_data,
-            project_path=self._project_path,
-            backup=backup
-        )
+        # encode the project data here, so we can tell if it changed since the last save
+        project_json_encoded = ProjectUtils.encode_project_data(project_data)
+        project_json_digest = hashlib.blake2b(project_json_encoded, digest_size=16).digest()
+
+        # if nothing changed since the last save (for eg. a file was linked and then unlinked),
+        # there's no need to write the file again
+        if project_json_digest == self._last_saved_digest:
+            logger.debug('Project "%s" is identical to the saved file. Not writing it again.', self._project_path)
+            save_result = os.path.join(self._project_path, 'project.json')
+
+        else:
+            # use the project utils function to write the project to the file
+            save_result = ProjectUtils.write_to_project_file(
+                project_data=project_data,
+                project_path=self._project_path,
+                backup=backup,
+                project_json_encoded=project_json_encoded
+            )
 
         # set the exists flag to True
         self._exists = True
 
         if save_result:
+            # remember what we saved
+            self._last_saved_digest = project_json_digest
+
             # set the last save time
             self._last_save_time = time.time()
 
-            # reset the save timer
-            self._save_timer = None
-
             # reset the dirty flag back to False
             self.set_dirty(False)
 
         # if we're supposed to call a function when the project is saved
         if save_result and if_successful is not None:
-            logger.debug('Project "{}" saved successfully.'.format(self._project_path))
+            logger.debug('Project "%s" saved successfully.', self._project_path)
 
             # call the function
             if_successful()
 
         # if we're supposed to call a function when the save failed
         elif not save_result and if_failed is not None:
-            logger.debug('Project "{}" failed to save.'.format(self._project_path))
+            logger.debug('Project "%s" failed to save.', self._project_path)
             if_failed()
 
         return save_result
@@ -434,38 +523,28 @@ class Project:
         """
 
         if file_path is None or not isinstance(file_path, str):
-            logger.debug('Cannot link file {} to project {}.'.format(file_path, self._project_path))
+            logger.debug('Cannot link file %s to project %s.', file_path, self._project_path)
             return False
 
-        # decide which list to add the file path to
-        if object_type == 'transcription':
-
-            if not self._transcriptions:
-                self._transcriptions = []
-
-            if file_path not in self._transcriptions:
-                self._transcriptions.append(file_path)
-
-        elif object_type == 'story':
+        # decide which set to add the file path to
+        linked_attribute = self.__linked_object_types.get(object_type, None)
 
-            if not self._stories:
-                self._stories = []
-
-            if file_path not in self._stories:
-                self._stories.append(file_path)
+        if linked_attribute is None:
+            logger.debug('Cannot link file %s to project %s - unknown object type "%s".',
+                         file_path, self._project_path, object_type)
+            return False
 
-        elif object_type == 'document':
+        linked_paths = getattr(self, linked_attribute)
 
-            if not self._documents:
-                self._documents = []
+        if linked_paths is None:
+            linked_paths = set()
+            setattr(self, linked_attribute, linked_paths)
 
-            if file_path not in self._documents:
-                self._documents.append(file_path)
+        # if the file is already linked, there's nothing to change
+        if file_path in linked_paths:
+            return True
 
-        else:
-            logger.debug('Cannot link file {} to project {} - unknown object type "{}".'
-                         .format(file_path, self._project_path, object_type))
-            return False
+        linked_paths.add(file_path)
 
         self.set_dirty(save_soon=save_soon)
 
@@ -477,34 +556,37 @@ class Project:
         """
 
         if file_path is None or not isinstance(file_path, str):
-            logger.debug('Cannot unlink file {} from project {}.'.format(file_path, self._project_path))
+            logger.debug('Cannot unlink file %s from project %s.', file_path, self._project_path)
             return False
 
-        # decide which list to add the file path to
-        if object_type == 'transcription':
-            if self._transcriptions and file_path in self._transcriptions:
-                self._transcriptions.remove(file_path)
+        # decide which set to remove the file path from
+        linked_attribute = self.__linked_object_types.get(object_type, None)
 
-        elif object_type == 'story':
-            if self._stories and file_path in self._stories:
-                self._stories.remove(file_path)
+        if linked_attribute is None:
+            logger.debug('Cannot unlink file %s from project %s - unknown object type "%s".',
+                         file_path, self._project_path, object_type)
+            return False
 
-        elif object_type == 'document':
-            if self._documents and file_path in self._documents:
-                self._documents.remove(file_path)
+        linked_paths = getattr(self, linked_attribute)
 
-        else:
-            logger.debug('Cannot unlink file {} from project {} - unknown object type "{}".'
-                         .format(file_path, self._project_path, object_type))
-            return False
+        # if the file wasn't linked, there's nothing to change
+        if not linked_paths or file_path not in linked_paths:
+            return True
+
+        linked_paths.discard(file_path)
 
         self.set_dirty(save_soon=save_soon)
 
         return True
 
     @staticmethod
+    @functools.lru_cache(maxsize=1024)
     def get_project_path_id(project_path):
-        return hashlib.md5(project_path.encode('utf-8')).hexdigest()
+        """
+        This returns the normalized project path, which we use to identify the project instances
+        (so that, for eg., a trailing slash or a different case on Windows doesn't lead to another instance)
+        """
+        return os.path.normcase(os.path.abspath(project_path))
 
     def is_linked_to_project(self, object_type, file_path):
         """
@@ -512,26 +594,20 @@ class Project:
         """
 
         if file_path is None or not isinstance(file_path, str):
-            logger.debug('Cannot unlink file {} from project {}.'.format(file_path, self._project_path))
+            logger.debug('Cannot unlink file %s from project %s.', file_path, self._project_path)
             return False
 
-        # decide which list to add the file path to
-        if object_type == 'transcription':
-            if self._transcriptions:
-                return file_path in self._transcriptions
+        # decide which set to look into
+        linked_attribute = self.__linked_object_types.get(object_type, None)
 
-        elif object_type == 'story':
-            if self._stories:
-                return file_path in self._stories
+        if linked_attribute is None:
+            logger.debug('Cannot find link for file %s to project %s - unknown object type "%s".',
+                         file_path, self._project_path, object_type)
+            return False
 
-        elif object_type == 'document':
-            if self._documents:
-                return file_path in self._documents
+        linked_paths = getattr(self, linked_attribute)
 
-        else:
-            logger.debug('Cannot find link for file {} to project {} - unknown object type "{}".'
-                         .format(file_path, self._project_path, object_type))
-        return False
+        return bool(linked_paths) and file_path in linked_paths
 
     def get_timeline_setting(self, timeline_name: str, setting_key: str):
         """
@@ -542,22 +618,22 @@ class Project:
         """
 
         if timeline_name is None or not isinstance(timeline_name, str):
-            logger.debug('Cannot get setting "{}" for timeline "{}".'.format(setting_key, timeline_name))
+            logger.debug('Cannot get setting "%s" for timeline "%s".', setting_key, timeline_name)
             return None
 
         if setting_key is None or not isinstance(setting_key, str):
-            logger.debug('Cannot get setting "{}" for timeline "{}".'.format(setting_key, timeline_name))
+            logger.debug('Cannot get setting "%s" for timeline "%s".', setting_key, timeline_name)
+            return None
 
         # does this project have timelines?
         # is there a reference regarding the passed timeline?
         # is there a reference regarding the passed setting key?
-        if self.timelines and timeline_name in self.timelines:
-
-            # then return the setting value
-            return self.timelines[timeline_name].get(setting_key, None)
+        try:
+            return self._timelines[timeline_name][setting_key]
 
         # if the setting key, or any of the stuff above wasn't found
-        return None
+        except (KeyError, TypeError):
+            return None
 
     def get_timeline_transcriptions(self, timeline_name):
         """
@@ -590,8 +666,7 @@ class Project:
 
         if transcription_file_path is None or not isinstance(transcription_file_path, str)\
                 or timeline_name is None or not isinstance(timeline_name, str):
-            logger.debug('Cannot link transcription {} to timeline {}.'
-                         .format(transcription_file_path, timeline_name))
+            logger.debug('Cannot link transcription %s to timeline %s.', transcription_file_path, timeline_name)
             return False
 
         if self.timelines is None:
@@ -620,8 +695,7 @@ class Project:
 
         if transcription_file_path is None or not isinstance(transcription_file_path, str)\
                 or timeline_name is None or not isinstance(timeline_name, str):
-            logger.debug('Cannot link transcription {} to timeline {}.'
-                         .format(transcription_file_path, timeline_name))
+            logger.debug('Cannot link transcription %s to timeline %s.', transcription_file_path, timeline_name)
             return False
 
         if timeline_name not in self.timelines:
@@ -649,7 +723,7 @@ class Project:
         """
 
         if timeline_name is None:
-            logger.debug('Cannot set markers for timeline "{}".'.format(timeline_name))
+            logger.debug('Cannot set markers for timeline "%s".', timeline_name)
             return False
 
         if self.timelines is None:
@@ -661,7 +735,7 @@ class Project:
         # only allow a dict of markers or None
         # the dict items usually look like this: {marker_frame: {color, duration, note, name, customData, ...}}
         if not isinstance(markers, dict) and markers is not None:
-            logger.debug('Cannot set markers for timeline "{}" in this format.'.format(timeline_name, markers))
+            logger.debug('Cannot set markers for timeline "%s" in this format.', timeline_name)
             return False
 
         # remove the markers key from the timeline if the markers are None
@@ -691,7 +765,7 @@ class Project:
         """
 
         if timeline_name is None:
-            logger.debug('Cannot set timecode data for timeline "{}".'.format(timeline_name))
+            logger.debug('Cannot set timecode data for timeline "%s".', timeline_name)
             return False
 
         if self.timelines is None:
@@ -741,8 +815,11 @@ class Project:
         # delete the project folder
         shutil.rmtree(self._project_path)
 
+        # there's no saved project file anymore
+        self._last_saved_digest = None
+
         # delete the instance from the instances dict
-        del self._instances[self.get_project_path_id(self._project_path)]
+        del self._instances[self._project_path_id]
 
         return True
 
@@ -750,7 +827,19 @@ class Project:
 class ProjectUtils:
 
     @staticmethod
-    def write_to_project_file(project_data, project_path, backup=False):
+    def encode_project_data(project_data):
+        """
+        This encodes the project data to the json bytes that are written to the project file
+        """
+        return json_utils.dumps(project_data, indent=True)
+
+    @staticmethod
+    def write_to_project_file(project_data, project_path, backup=False, project_json_encoded=None):
+        """
+        This writes the project data to the project.json file in the project path
+        If the project data was already encoded (see encode_project_data), pass it as project_json_encoded
+        so it's not encoded again
+        """
 
         if project_path is None:
             logger.error('Cannot save project to path "{}".'.format(project_path))
@@ -767,7 +856,7 @@ class ProjectUtils:
         if not os.path.isdir(project_path):
 
             # create the directory
-            logger.debug("Creating directory project directory {}".format(project_path))
+            logger.debug('Creating directory project directory %s', project_path)
             try:
                 os.makedirs(project_path)
 
@@ -790,41 +879,71 @@ class ProjectUtils:
             if not os.path.exists(backups_dir):
                 os.mkdir(backups_dir)
 
+            # list the existing backup files only once, instead of checking each possible file name separately
+            with os.scandir(backups_dir) as backup_entries:
+                existing_backups = {backup_entry.name for backup_entry in backup_entries}
+
             # format the name of the backup file
             backup_project_file_path = 'project.backup.json'
 
             # if another backup file with the same name already exists, add a consecutive number to the end
             backup_n = 0
-            while os.path.exists(os.path.join(backups_dir, backup_project_file_path)):
-
-                # get the modified time of the existing backup file
-                backup_file_modified_time = os.path.getmtime(os.path.join(backups_dir, backup_project_file_path))
-
-                # if the backup file was modified less than [backup] hours ago, we don't need to save another backup
-                if (isinstance(backup, float) or isinstance(backup, int)) \
-                        and time.time() - backup_file_modified_time < backup * 60 * 60:
-                    backup = False
-                    break
+            last_backup_file_path = None
+            while backup_project_file_path in existing_backups:
+                last_backup_file_path = backup_project_file_path
 
                 backup_n += 1
                 backup_project_file_path = 'project.backup.{}.json'.format(backup_n)
 
+            # if the last backup file was modified less than [backup] hours ago, we don't need to save another backup
+            if last_backup_file_path is not None and isinstance(backup, (float, int)):
+
+                try:
+                    backup_file_modified_time = os.path.getmtime(os.path.join(backups_dir, last_backup_file_path))
+
+                    if time.time() - backup_file_modified_time < backup * 60 * 60:
+                        backup = False
+
+                except OSError:
+                    pass
+
             # if the backup setting is still not negative, we should save a backup
             if backup:
                 # copy the existing file to the backup
                 shutil \
                     .copyfile(project_file_path, os.path.join(backups_dir, backup_project_file_path))
 
-                logger.debug('Copied project file to backup: {}'.format(backup_project_file_path))
+                logger.debug('Copied project file to backup: %s', backup_project_file_path)
 
         # encode the project json (do this before writing to the file, to make sure it's valid)
-        project_json_encoded = json.dumps(project_data, indent=4)
+        if project_json_encoded is None:
+            project_json_encoded = ProjectUtils.encode_project_data(project_data)
 
-        # write the project json to the file
-        with open(project_file_path, 'w', encoding='utf-8') as outfile:
-            outfile.write(project_json_encoded)
+        # write the project json to a temporary file first and then replace the project file with it,
+        # so that the project file is never left half-written (for eg. if the app crashes during the write)
+        project_tmp_file_path = project_file_path + '.tmp'
+        try:
+            with open(project_tmp_file_path, 'wb') as outfile:
+                outfile.write(project_json_encoded)
+
+                # make sure the data is on the disk before replacing the project file
+                outfile.flush()
+                os.fsync(outfile.fileno())
+
+            os.replace(project_tmp_file_path, project_file_path)
+
+        except OSError:
+            logger.error('Cannot save project to file "{}".'.format(project_file_path), exc_info=True)
+
+            # don't leave the temporary file behind
+            try:
+                os.remove(project_tmp_file_path)
+            except OSError:
+                pass
 
-        logger.debug('Saved project to file: {}'.format(project_file_path))
+            return False
+
+        logger.debug('Saved project to file: %s', project_file_path)
 
         return project_file_path
 
@@ -880,9 +999,14 @@ class ProjectUtils:
         zip_file = zipfile.ZipFile(import_path, 'r')
 
         # create a temporary directory to extract the zip file
+        # - next to the projects directory, so that it's most likely on the same device and the files
+        #   can be simply renamed into the project directory below, instead of being copied byte by byte
         import tempfile
 
-        with tempfile.TemporaryDirectory() as temp_dir:
+        temp_parent_dir = os.path.dirname(os.path.abspath(projects_path))
+        os.makedirs(temp_parent_dir, exist_ok=True)
+
+        with tempfile.TemporaryDirectory(dir=temp_parent_dir) as temp_dir:
             # extract all the files from the zip file
             zip_file.extractall(temp_dir)
 
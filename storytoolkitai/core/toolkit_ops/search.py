@@ -619,14 +619,17 @@ class TextSearch(SearchItem):
         # split the text into phrases using punctuation or double new lines as dividers
         phrases = re.split(r'[\.\?\!]{1}\s+|[\.\?\!]{1}$|[\n]{2,}', file_text)
 
+        # the minimum phrase length doesn't change while we're going through the phrases
+        search_corpus_min_length = \
+            self.stAI.get_app_setting(setting_name='search_corpus_min_length', default_if_none=2)
+
         # then add each phrase to the search corpus
         for phrase_index, phrase in enumerate(phrases):
 
             # but only if it's longer than x characters
             # to avoid adding stuff that is most likely meaningless
             # like punctuation marks
-            if len(phrase) > self.stAI.get_app_setting(
-                    setting_name='search_corpus_min_length', default_if_none=2):
+            if len(phrase) > search_corpus_min_length:
 
                 # remember the text file path and the phrase number
                 # this is the phrase index relative to the whole search corpus that
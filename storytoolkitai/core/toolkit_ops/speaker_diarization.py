@@ -50,7 +50,7 @@ def speaker_changed(segment1_embedding, segment2_embedding, threshold=0.3):
 
 def detect_speaker_changes(
         segments, audio_file_path, threshold=0.3, device_name=None, time_intervals=None, speaker_id_offset=0,
-        step_by_step=False):
+        step_by_step=False, audio_array=None):
     """
     Detect speaker changes in a list of segments and adds the speaker_id to the segments.
 
@@ -64,6 +64,8 @@ def detect_speaker_changes(
             - if None, the entire audio file will be used
     :param: speaker_id_offset: the offset to use for the speaker IDs (default: 0)
     :param: step_by_step: if True, the function will yield the segments and speaker embeddings after each iteration
+    :param: audio_array: the already decoded audio file as a 16kHz mono float32 array (default: None)
+            - if passed, the audio file will not be decoded again
     """
 
     if segments is None or not isinstance(segments, list) or len(segments) == 0:
@@ -101,60 +103,69 @@ def detect_speaker_changes(
     model = PretrainedSpeakerEmbedding("speechbrain/spkrec-ecapa-voxceleb", device=torch.device(torch_device))
     audio = Audio(sample_rate=16000, mono="downmix")
 
-    # try to see if we can handle the audio file natively
-    # for that, we just perform a test crop of a second
-    try:
-        audio.crop(audio_file_path, Segment(0, 1))
-        audio_file = audio_file_path
-    except:
+    # if we already have the decoded audio, use it directly
+    if audio_array is not None:
 
-        logger.debug('Falling back to Librosa for {} due to audio format.'
-                     .format(os.path.basename(audio_file_path)))
+        # Convert numpy array to a PyTorch tensor and reshape it to (channel, time)
+        audio_tensor = torch.tensor(audio_array).unsqueeze(0)  # adds a channel dimension
 
-        # load audio file as array using librosa
-        # this should work for most audio formats
-        try:
-            audio_array, sr = librosa.load(audio_file_path, sr=16_000)
+        audio_file = {"waveform": audio_tensor, "sample_rate": 16000}
 
-        # if the above fails, try this:
+    else:
+        # try to see if we can handle the audio file natively
+        # for that, we just perform a test crop of a second
+        try:
+            audio.crop(audio_file_path, Segment(0, 1))
+            audio_file = audio_file_path
         except:
 
-            logger.debug('Librosa failed. Falling back to moviepy for {} due to audio format.'
+            logger.debug('Falling back to Librosa for {} due to audio format.'
                          .format(os.path.basename(audio_file_path)))
 
-            # we need to determine the raw sample rate of the audio first
-            raw_sr = MediaUtils.get_audio_sample_rate(audio_file_path)
+            # load audio file as array using librosa
+            # this should work for most audio formats
+            try:
+                audio_array, sr = librosa.load(audio_file_path, sr=16_000)
+
+            # if the above fails, try this:
+            except:
 
-            if raw_sr is None:
-                logger.warning('Falling back to 48000Hz for {} due to audio format, '
-                               'but this might provide inaccurate results. '
-                               'Please use a recommended file format to avoid falling back to this default.'
-                               .format(os.path.basename(audio_file_path)))
+                logger.debug('Librosa failed. Falling back to moviepy for {} due to audio format.'
+                             .format(os.path.basename(audio_file_path)))
 
-                raw_sr = 48000
+                # we need to determine the raw sample rate of the audio first
+                raw_sr = MediaUtils.get_audio_sample_rate(audio_file_path)
 
-            sr = 16000
+                if raw_sr is None:
+                    logger.warning('Falling back to 48000Hz for {} due to audio format, '
+                                   'but this might provide inaccurate results. '
+                                   'Please use a recommended file format to avoid falling back to this default.'
+                                   .format(os.path.basename(audio_file_path)))
 
-            # if this is a video file, extract the audio from it
-            try:
-                video = VideoFileClip(audio_file_path)
-                raw_audio_array = video.audio.to_soundarray(fps=raw_sr)
-            except:
-                # last chance, if this is audio-only, try to load it with AudioFileClip
+                    raw_sr = 48000
 
-                audio = AudioFileClip(audio_file_path)
-                raw_audio_array = audio.to_soundarray(fps=raw_sr)
+                sr = 16000
 
-            audio_array = librosa.core.resample(np.asfortranarray(raw_audio_array.T), orig_sr=raw_sr, target_sr=sr)
-            audio_array = librosa.core.to_mono(audio_array)
+                # if this is a video file, extract the audio from it
+                try:
+                    video = VideoFileClip(audio_file_path)
+                    raw_audio_array = video.audio.to_soundarray(fps=raw_sr)
+                except:
+                    # last chance, if this is audio-only, try to load it with AudioFileClip
 
-            # change to float32
-            audio_array = np.asarray(audio_array, dtype=np.float32)
+                    audio = AudioFileClip(audio_file_path)
+                    raw_audio_array = audio.to_soundarray(fps=raw_sr)
 
-        # Convert numpy array to a PyTorch tensor and reshape it to (channel, time)
-        audio_tensor = torch.tensor(audio_array).unsqueeze(0)  # adds a channel dimension
+                audio_array = librosa.core.resample(np.asfortranarray(raw_audio_array.T), orig_sr=raw_sr, target_sr=sr)
+                audio_array = librosa.core.to_mono(audio_array)
+
+                # change to float32
+                audio_array = np.asarray(audio_array, dtype=np.float32)
+
+            # Convert numpy array to a PyTorch tensor and reshape it to (channel, time)
+            audio_tensor = torch.tensor(audio_array).unsqueeze(0)  # adds a channel dimension
 
-        audio_file = {"waveform": audio_tensor, "sample_rate": sr}
+            audio_file = {"waveform": audio_tensor, "sample_rate": sr}
 
     # we're storing the embeddings for each speaker in a dictionary
     # so that we can compare them once a speaker change is detected
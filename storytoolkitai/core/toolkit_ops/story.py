@@ -269,7 +269,8 @@ class Story:
 
     @staticmethod
     def get_story_path_id(story_file_path: str = None):
-        return hashlib.md5(story_file_path.encode('utf-8')).hexdigest()
+        # only used to identify the story during runtime, so a short blake2s digest is enough
+        return hashlib.blake2s(story_file_path.encode('utf-8'), digest_size=8).hexdigest()
     
     def _load_json_into_attributes(self):
 
@@ -1056,14 +1057,9 @@ class StoryUtils:
         if not story_lines:
             return
 
+        # write txt lines (all at once, instead of flushing each line separately)
         with open(txt_file_path, "w", encoding="utf-8") as txt_file:
-            for line in story_lines:
-                # write txt lines
-                print(
-                    line.text.rstrip('\n'),
-                    file=txt_file,
-                    flush=True,
-                )
+            txt_file.write(''.join([line.text.rstrip('\n') + '\n' for line in story_lines]))
 
     @staticmethod
     def prepare_export(
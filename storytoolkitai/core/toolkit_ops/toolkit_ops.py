@@ -1,29 +1,32 @@
 import os
+import stat
 import sys
 import time
 import json
 import yaml
 import subprocess
 import platform
+import hashlib
+import contextlib
 
-from threading import Thread
+from threading import Thread, Lock, get_ident
 
 import torch
 import storytoolkitai.integrations.mots_whisper as whisper
+import storytoolkitai.integrations.mots_faster_whisper as faster_whisper
 from whisper import tokenizer as whisper_tokenizer
 
-from transformers import pipeline
-
 import librosa
 import soundfile
 
 import tqdm
 
 from storytoolkitai.core.logger import logger
+from storytoolkitai.core import json_utils
 
 from storytoolkitai.integrations.mots_resolve import MotsResolve
 
-from storytoolkitai import USER_DATA_PATH
+from storytoolkitai import CACHE_PATH
 
 from .projects import Project, get_projects_from_path, ProjectUtils
 from .transcription import Transcription, TranscriptionSegment, TranscriptionUtils
@@ -34,7 +37,6 @@ from .search import ToolkitSearch, SearchItem, TextSearch, VideoSearch, cv2
 from .assistant import ToolkitAssistant, AssistantUtils
 from .assistant import DEFAULT_SYSTEM_MESSAGE as ASSISTANT_DEFAULT_SYSTEM_MESSAGE
 from .media import MediaUtils
-from .speaker_diarization import detect_speaker_changes
 from .timecode import sec_to_tc, tc_to_sec
 
 from timecode import Timecode
@@ -46,6 +48,10 @@ from .videoanalysis import ClipIndex
 from .media import MediaItem, VideoFileClip, AudioFileClip
 
 
+# where we store the decoded audio of the files that we transcribe
+AUDIO_CACHE_DIR = os.path.join(CACHE_PATH, 'audio')
+
+
 def is_arm64_mac():
     return platform.system() == 'Darwin' and platform.machine() == 'arm64'
 
@@ -138,11 +144,47 @@ class ToolkitOps:
         # use this to store the whisper model later
         self.whisper_model = None
 
+        # the torch device that the whisper model was loaded on
+        # (self.torch_device may change in the meantime, for eg. when items are added to the queue)
+        self._whisper_model_device = None
+
+        # this will hold the list of available whisper models once it's requested
+        self._whisper_available_models = None
+
+        # the whisper model is loaded once and re-used by the following transcriptions,
+        # so we use this lock to make sure that only one thread (re-)loads the model at a time
+        self._whisper_model_lock = Lock()
+
+        # each transcription job holds this lock while using the model it got from _initialize_whisper_transcribe,
+        # so two jobs never run on the same model at the same time
+        # (this is replaced with a new lock each time a new model is loaded)
+        self._whisper_model_job_lock = Lock()
+
         # load the whisper model from the config
         # we're recommending the medium model for better accuracy vs. time it takes to process
         # if in doubt use the large model but that will need more time
         self.whisper_model_name = self.stAI.get_app_setting(setting_name='whisper_model_name', default_if_none='medium')
 
+        # the model name can also be overridden via the environment (for eg. on headless machines)
+        self.whisper_model_name = os.environ.get('STAI_WHISPER_MODEL', self.whisper_model_name)
+
+        # the whisper backend to use for transcriptions - either 'faster-whisper' or 'openai-whisper'
+        # faster-whisper (CTranslate2, int8) is used when available, since it's much faster than openai-whisper
+        self.whisper_backend = self.stAI.get_app_setting(setting_name='whisper_backend',
+                                                         default_if_none='faster-whisper')
+
+        # fall back to openai-whisper if faster-whisper is not installed
+        if self.whisper_backend == 'faster-whisper' and not faster_whisper.FASTER_WHISPER_AVAILABLE:
+            logger.debug('faster-whisper not available. Using openai-whisper backend.')
+            self.whisper_backend = 'openai-whisper'
+
+        # the compute type used by faster-whisper (for eg. int8_float16, int8, float16, float32)
+        # if not set, it will be selected automatically depending on the device
+        self.whisper_compute_type = os.environ.get(
+            'STAI_COMPUTE_TYPE',
+            self.stAI.get_app_setting(setting_name='whisper_compute_type', default_if_none=None)
+        )
+
         # get the whisper device setting
         # currently, the setting may be cuda, cpu or auto
         self.torch_device = stAI.get_app_setting('torch_device', default_if_none='auto')
@@ -212,6 +254,21 @@ class ToolkitOps:
         if self.stAI.cli_args and self.stAI.cli_args.mode != 'cli' and self.processing_queue.resume_queue_from_file():
             logger.info('Resuming queue from file')
 
+    def attach_UI(self, toolkit_UI_obj):
+        """
+        Connects the UI object to this toolkit_ops object
+        (this should be called only once, right after the UI was created)
+        """
+
+        self.toolkit_UI_obj = toolkit_UI_obj
+
+    def is_UI_obj_available(self):
+        """
+        Returns True if a UI object was attached to this toolkit_ops object
+        """
+
+        return self.toolkit_UI_obj is not None
+
     def attach_observer(self, action, observer):
         """
         Attach an observer to an action
@@ -272,7 +329,7 @@ class ToolkitOps:
             return False
 
         # if the source file path is a file, return the file path
-        elif os.path.isdir(dir_path):
+        else:
 
             # get all the files in the directory
             # either recursively
@@ -281,11 +338,15 @@ class ToolkitOps:
             else:
                 all_files = []
                 reached_limit = False
+
+                # get the limit only once, not for every file
+                ingest_file_limit = int(self.stAI.get_app_setting('ingest_file_limit', default_if_none=30))
+
                 for root, dirs, files in os.walk(dir_path):
                     for file in files:
                         all_files.append(os.path.join(root, file))
 
-                        if len(all_files) > int(self.stAI.get_app_setting('ingest_file_limit', default_if_none=30)):
+                        if len(all_files) > ingest_file_limit:
                             logger.warning('Going over the ingest files limit. Stopping at {} files.'
                                            .format(len(all_files)))
 
@@ -351,20 +412,24 @@ class ToolkitOps:
         # loop through the source file paths
         for source_file_path in source_file_paths:
 
-            # check if the source file path exists
-            if not os.path.exists(source_file_path):
-                # if it doesn't exist, log a warning and go to the next path
+            # stat the source file path only once and use the result for all the checks below
+            # (this can be slow for files on network drives)
+            try:
+                source_file_mode = os.stat(source_file_path).st_mode
+
+            # if it doesn't exist, log a warning and go to the next path
+            except OSError:
                 logger.warning('Source file path does not exist: ' + source_file_path)
                 continue
 
             # if it's a DIRECTORY, add all the valid media files in the folder to the queue
-            if os.path.isdir(source_file_path):
+            if stat.S_ISDIR(source_file_mode):
 
                 # get all the valid media files in the folder
                 valid_source_file_paths += self.get_all_valid_media_paths_in_dir(source_file_path, recursive=True)
 
             # if it's a FILE, check if it's a valid media file
-            if os.path.isfile(source_file_path):
+            elif stat.S_ISREG(source_file_mode):
 
                 # if it's a valid media file, add it to the queue
                 if self.is_valid_media_file(source_file_path):
@@ -715,6 +780,17 @@ class ToolkitOps:
         # return only the filtered parameters
         return filtered_parameters
 
+    def get_whisper_available_models(self) -> list:
+        """
+        This returns the list of available whisper models
+        (the list is only built the first time it's requested)
+        """
+
+        if self._whisper_available_models is None:
+            self._whisper_available_models = list(whisper.available_models())
+
+        return self._whisper_available_models
+
     def get_whisper_available_languages(self) -> list or None:
 
         available_languages = whisper_tokenizer.LANGUAGES.values()
@@ -1502,6 +1578,10 @@ class ToolkitOps:
             queue_id=queue_id, save_to_file=False, status='loading'
         )
 
+        # import the speaker diarization module only when we need it,
+        # since pyannote takes a long time to import and would slow down the app start
+        from .speaker_diarization import detect_speaker_changes
+
         processed_segments = 0
         resulting_segments = []
         for resulting_segments, speaker_embeddings in detect_speaker_changes(
@@ -1509,7 +1589,9 @@ class ToolkitOps:
             device_name=kwargs.get('device', None),
             time_intervals=kwargs.get('time_intervals', None),
             speaker_id_offset=speaker_id_offset,
-            step_by_step=True
+            step_by_step=True,
+            # re-use the audio that was decoded during the transcription (if it's still cached)
+            audio_array=self._load_cached_audio_array(transcription.audio_file_path)
         ):
             processed_segments += 1
 
@@ -1589,14 +1671,27 @@ class ToolkitOps:
 
         return speaker_segments
 
-    def whisper_transcribe_segments(self, audio_segments, task, other_options, queue_id=None):
+    def whisper_transcribe_segments(self, audio_segments, task, other_options, queue_id=None,
+                                    whisper_model=None, whisper_device=None):
         """
         Transcribes only the passed audio segments
         and offsets the transcription segments start and end times
 
         Only returns the transcription segments
+
+        :param whisper_model: the model to transcribe with, as returned by _initialize_whisper_transcribe
+                              (the caller should hold the job lock of the model while this runs)
+        :param whisper_device: the torch device of the above model
         """
 
+        # use the model that was passed for this job, so it doesn't change even if another job loads another model
+        if whisper_model is None:
+            whisper_model = self.whisper_model
+            whisper_device = self._whisper_model_device
+
+        if whisper_device is None:
+            whisper_device = self.torch_device
+
         # get the transcription object if a transcription_file_path exists
         transcription = Transcription(transcription_file_path=other_options.get('transcription_file_path')) \
             if other_options.get('transcription_file_path', None) else None
@@ -1646,17 +1741,24 @@ class ToolkitOps:
             ):
                 del decoding_options['language']
 
+            # skip the autograd bookkeeping during inference and, on CUDA, let the openai-whisper matmuls run in fp16
+            # (faster-whisper doesn't use torch for inference, so autocast makes no difference there)
+            autocast = torch.autocast(device_type='cuda', dtype=torch.float16) \
+                if self.whisper_backend == 'openai-whisper' and str(whisper_device).startswith('cuda') \
+                and decoding_options.get('fp16', True) else contextlib.nullcontext()
+
             # run whisper transcribe on the audio segment
-            result = self.whisper_model.transcribe(audio_segment[2],
-                                                   task=task,
-                                                   verbose=True,
-                                                   queue_id=queue_id,
-                                                   toolkit_ops_obj=self,
-                                                   total_duration=total_duration,
-                                                   audio_segment_duration=audio_segment[1] - audio_segment[0],
-                                                   previous_progress=previous_progress,
-                                                   **decoding_options
-                                                   )
+            with torch.inference_mode(), autocast:
+                result = whisper_model.transcribe(audio_segment[2],
+                                                  task=task,
+                                                  verbose=True,
+                                                  queue_id=queue_id,
+                                                  toolkit_ops_obj=self,
+                                                  total_duration=total_duration,
+                                                  audio_segment_duration=audio_segment[1] - audio_segment[0],
+                                                  previous_progress=previous_progress,
+                                                  **decoding_options
+                                                  )
 
             # remove word timestamps from final transcription until we implement word-based editing
             other_options['post_remove_word_timestamps'] = \
@@ -1802,21 +1904,43 @@ class ToolkitOps:
     def _initialize_whisper_transcribe(self, queue_id=None, **other_options):
         """
         This initializes everything that is needed for whisper
+        and returns the model that the transcription job should use, together with its device and job lock
+        (or None if the model couldn't be loaded or the job was canceled)
+
+        The job should use only the returned model (not self.whisper_model, which another job might replace)
+        and hold the returned lock for as long as it's using it
         """
 
-        torch_device_changed = False
-        # change the torch device if it was passed and it's different from the current one
-        if other_options.get('device', None) and self.torch_device != other_options.get('device'):
-            # select the new whisper device but take it through the torch device selection to make sure it's valid
-            self.torch_device = self.torch_device_type_select(other_options.get('device', None))
+        # wait for any other thread that is loading the model
+        with self._whisper_model_lock:
+            if not self._initialize_whisper_model(queue_id=queue_id, **other_options):
+                return None
+
+            return self.whisper_model, self._whisper_model_device, self._whisper_model_job_lock
 
-            torch_device_changed = True
+    def _initialize_whisper_model(self, queue_id=None, **other_options):
+        """
+        This (re-)loads the whisper model, but only if it wasn't loaded before,
+        or if the model name or the device changed
+        (use _initialize_whisper_transcribe to call this)
+
+        Note that this replaces self.whisper_model, so jobs that are already running
+        must use the model they got from _initialize_whisper_transcribe instead
+        """
+
+        # select the device for this job (use the one that was passed, if any),
+        # but take it through the torch device selection to make sure it's valid
+        # (the queue items usually contain a torch.device, so pass its type as a string)
+        requested_device = other_options.get('device', None)
+        whisper_device = self.torch_device_type_select(
+            str(requested_device).split(':')[0] if requested_device else None)
 
         # load OpenAI Whisper model
-        # if it wasn't loaded before, if the model name changed (via other_options) or if the torch device changed
+        # if it wasn't loaded before, if the model name changed (via other_options)
+        # or if it's on another device than the one this job needs
         if self.whisper_model is None \
                 or ('model_name' in other_options and self.whisper_model_name != other_options['model_name']) \
-                or torch_device_changed:
+                or str(self._whisper_model_device) != str(whisper_device):
 
             # use the model name that was passed in the call or the one that's already set
             self.whisper_model_name = other_options.get('model_name', self.whisper_model_name)
@@ -1849,16 +1973,59 @@ class ToolkitOps:
             if self.processing_queue.cancel_if_canceled(queue_id=queue_id):
                 return None
 
-            logger.info('Loading Whisper {} model.'.format(self.whisper_model_name))
+            # release the previously loaded model before loading the new one,
+            # so that we don't hold two models in (GPU) memory at the same time
+            # (if a running job still uses it, it will be released when that job is done)
+            if self.whisper_model is not None:
+                self.whisper_model = None
+
+                if torch.cuda.is_available():
+                    torch.cuda.empty_cache()
+
+            logger.info('Loading Whisper {} model using {}.'.format(self.whisper_model_name, self.whisper_backend))
             try:
-                self.whisper_model = whisper.load_model(self.whisper_model_name, device=self.torch_device)
+                if self.whisper_backend == 'faster-whisper':
+                    self.whisper_model = faster_whisper.load_model(
+                        self.whisper_model_name, device=whisper_device,
+                        compute_type=self.whisper_compute_type,
+                        batch_size=self.stAI.get_app_setting(setting_name='whisper_batch_size', default_if_none=16)
+                    )
+                else:
+                    self.whisper_model = whisper.load_model(self.whisper_model_name, device=whisper_device)
+
+                    if str(whisper_device).startswith('cuda'):
+                        # allow TF32 matmuls and convolutions on Ampere+ GPUs (for whatever still runs in fp32),
+                        # and let cuDNN pick the fastest kernels, since the encoder input always has the same size
+                        torch.backends.cuda.matmul.allow_tf32 = True
+                        torch.backends.cudnn.allow_tf32 = True
+                        torch.backends.cudnn.benchmark = True
+
+                        # compile the encoder if the user asked for it
+                        # (the encoder input always has the same shape, so it compiles only once,
+                        # but the compilation itself may take a minute the first time)
+                        if self.stAI.get_app_setting(setting_name='whisper_compile_encoder', default_if_none=False) \
+                                and hasattr(torch, 'compile'):
+                            self._compile_whisper_encoder()
             except Exception as e:
+                # don't leave a half-loaded model behind
+                self.whisper_model = None
+                self._whisper_model_device = None
+
                 fail_error = 'Error loading Whisper {} model: {}'.format(self.whisper_model_name, e)
                 logger.error(fail_error)
 
                 # update the status of the item in the transcription log
                 self.processing_queue.update_queue_item(queue_id=queue_id, status='failed', fail_error=fail_error)
 
+                return None
+
+            # remember where the model was loaded
+            self._whisper_model_device = whisper_device
+
+            # the new model gets its own job lock,
+            # so jobs on the new model don't have to wait for the jobs that still use the old one
+            self._whisper_model_job_lock = Lock()
+
             # once the model has been loaded, we can note that in the app settings
             # this is a wat to keep track if the model has been downloaded or not
             # but it's not 100% reliable and we may need to find a better way to do this in the future
@@ -1878,10 +2045,148 @@ class ToolkitOps:
 
         return True
 
-    def _split_audio_into_segments(self, audio_file_path, queue_id=None, **kwargs):
+    def _compile_whisper_encoder(self):
         """
-        This splits the audio into segments that are suitable for Whisper
-        It also takes into consideration any inclusion or exclusion intervals
+        This compiles the encoder of the (openai-whisper) model with torch.compile
+        The decoder is left alone, since its input shape changes with each token
+        """
+
+        # keep the compiled kernels between app sessions, so we don't have to wait for them every time
+        os.environ.setdefault('TORCHINDUCTOR_CACHE_DIR', os.path.join(CACHE_PATH, 'inductor'))
+
+        try:
+            logger.debug('Compiling Whisper encoder.')
+            self.whisper_model.encoder = torch.compile(self.whisper_model.encoder)
+
+        except Exception as e:
+            logger.warning('Unable to compile Whisper encoder: {}'.format(e))
+
+    @staticmethod
+    def _get_audio_cache_file_path(audio_file_path):
+        """
+        This returns the path of the cache file for the decoded audio of the passed file
+        The cache file name depends on the file path, size and modification time,
+        so that changed files are decoded again
+        """
+
+        try:
+            audio_file_stat = os.stat(audio_file_path)
+        except OSError:
+            return None
+
+        cache_file_name = hashlib.md5('{}|{}|{}'.format(
+            os.path.abspath(audio_file_path), audio_file_stat.st_size, audio_file_stat.st_mtime
+        ).encode('utf-8')).hexdigest()
+
+        return os.path.join(AUDIO_CACHE_DIR, 'audio_{}.npy'.format(cache_file_name))
+
+    def _get_audio_cache_max_bytes(self):
+        """
+        This returns the maximum size of the decoded audio cache in bytes
+        (audio_cache_max_mb, which is 0 by default, meaning that the cache is disabled,
+        since one hour of decoded audio takes about 230MB of disk space)
+        """
+
+        try:
+            max_mb = float(self.stAI.get_app_setting(setting_name='audio_cache_max_mb', default_if_none=0))
+        except (TypeError, ValueError):
+            return 0
+
+        return max(0, int(max_mb * 1024 * 1024))
+
+    def _load_cached_audio_array(self, audio_file_path):
+        """
+        This loads the decoded 16kHz audio array of the file from the cache, if it exists
+        """
+
+        # the cache is disabled if its maximum size is 0
+        if not self._get_audio_cache_max_bytes():
+            return None
+
+        cache_file_path = self._get_audio_cache_file_path(audio_file_path)
+
+        if cache_file_path is None:
+            return None
+
+        try:
+            audio_array = np.load(cache_file_path)
+
+        except (OSError, ValueError):
+            return None
+
+        logger.debug('Using decoded audio from cache {}'.format(cache_file_path))
+
+        # touch the cache file so that it's the last one to be removed when we clean up the cache
+        try:
+            os.utime(cache_file_path)
+        except OSError:
+            pass
+
+        return audio_array
+
+    def _save_cached_audio_array(self, audio_file_path, audio_array):
+        """
+        This saves the decoded 16kHz audio array of the file to the cache
+        and removes the least recently used cache files if the cache is larger than audio_cache_max_mb
+        """
+
+        max_bytes = self._get_audio_cache_max_bytes()
+
+        # the cache is disabled if its maximum size is 0,
+        # and there's no point in caching arrays that don't fit in the cache anyway
+        if not max_bytes or audio_array is None or audio_array.nbytes > max_bytes:
+            return False
+
+        cache_file_path = self._get_audio_cache_file_path(audio_file_path)
+
+        if cache_file_path is None:
+            return False
+
+        # write to a temporary file first and then move it in place,
+        # so that other threads never load a half-written cache file
+        # (the name of the temporary file is unique for each thread, in case two threads cache the same file)
+        cache_tmp_file_path = '{}.{}.tmp'.format(cache_file_path, get_ident())
+
+        try:
+            os.makedirs(AUDIO_CACHE_DIR, exist_ok=True)
+
+            with open(cache_tmp_file_path, 'wb') as cache_file:
+                np.save(cache_file, audio_array)
+
+            os.replace(cache_tmp_file_path, cache_file_path)
+
+            # remove the least recently used cache files so that the cache doesn't grow over its maximum size
+            # (the cache files are touched each time they're used, so the newest ones are the most recently used)
+            with os.scandir(AUDIO_CACHE_DIR) as cache_entries:
+                cache_files = [(entry.path, entry.stat()) for entry in cache_entries
+                               if entry.is_file() and entry.name.startswith('audio_') and entry.name.endswith('.npy')]
+
+            cache_files.sort(key=lambda cache_file_info: cache_file_info[1].st_mtime, reverse=True)
+
+            cache_size = 0
+            for cache_file_info_path, cache_file_info_stat in cache_files:
+                cache_size += cache_file_info_stat.st_size
+
+                if cache_size > max_bytes:
+                    os.remove(cache_file_info_path)
+
+        except OSError:
+            logger.warning('Could not cache decoded audio for {}.'.format(audio_file_path), exc_info=True)
+
+            # don't leave the temporary file behind
+            try:
+                os.remove(cache_tmp_file_path)
+            except OSError:
+                pass
+
+            return False
+
+        return True
+
+    @staticmethod
+    def _load_audio_array(audio_file_path):
+        """
+        This loads the audio file as a 16kHz mono float32 array
         """
 
         # load audio file as array using librosa
@@ -1916,6 +2221,25 @@ class ToolkitOps:
             # change to float32
             audio_array = np.asarray(audio_array, dtype=np.float32)
 
+        return audio_array, sr
+
+    def _split_audio_into_segments(self, audio_file_path, queue_id=None, **kwargs):
+        """
+        This splits the audio into segments that are suitable for Whisper
+        It also takes into consideration any inclusion or exclusion intervals
+        """
+
+        # if we decoded this file before, re-use the cached audio array to avoid decoding and resampling it again
+        audio_array = self._load_cached_audio_array(audio_file_path)
+        sr = 16_000
+
+        if audio_array is None:
+            audio_array, sr = self._load_audio_array(audio_file_path)
+
+            # cache the decoded audio so that re-transcribing the file
+            # (for eg. with another model or to translate it) doesn't need to decode it again
+            self._save_cached_audio_array(audio_file_path, audio_array)
+
         # cancel transcription if user requested it
         if self.processing_queue.cancel_if_canceled(queue_id=queue_id):
             return None, None
@@ -2056,10 +2380,13 @@ class ToolkitOps:
         transcription.set('task', task)
         transcription.set('whisper_model', self.whisper_model_name)
 
-        # initialize whisper and get the audio array and sample rate
-        if not self._initialize_whisper_transcribe(queue_id=queue_id, **other_options):
+        # initialize whisper and get the model that we'll use for this transcription
+        whisper_job = self._initialize_whisper_transcribe(queue_id=queue_id, **other_options)
+        if not whisper_job:
             return None
 
+        whisper_model, whisper_device, whisper_model_job_lock = whisper_job
+
         # split the audio into segments according to the time intervals and pre-detect speech if requested
         audio_segments, time_intervals = self._split_audio_into_segments(
             audio_file_path=audio_file_path, queue_id=queue_id, **other_options)
@@ -2085,22 +2412,29 @@ class ToolkitOps:
             debug_message = "Transcribing {}.".format(name)
         # logger.info(debug_message)
 
-        if self.toolkit_UI_obj:
+        if self.toolkit_UI_obj is not None:
             self.toolkit_UI_obj.notify_via_os("Starting Transcription",
                                               text="Transcribing {}".format(name),
                                               debug_message=debug_message)
+        else:
+            logger.info(debug_message)
 
         # initialize empty result
         result = None
 
         # transcribe the audio segments
         # (or just one audio segment with the whole audio if no time intervals were passed)
+        # (hold the job lock of the model during the whole transcription,
+        # so no other job uses the same model until we're done with it)
         try:
-            result = self.whisper_transcribe_segments(audio_segments=audio_segments,
-                                                      task=task,
-                                                      other_options=other_options,
-                                                      queue_id=queue_id
-                                                      )
+            with whisper_model_job_lock:
+                result = self.whisper_transcribe_segments(audio_segments=audio_segments,
+                                                          task=task,
+                                                          other_options=other_options,
+                                                          queue_id=queue_id,
+                                                          whisper_model=whisper_model,
+                                                          whisper_device=whisper_device
+                                                          )
         except Exception as e:
             import traceback
             exc_info = traceback.format_exc()
@@ -2138,7 +2472,7 @@ class ToolkitOps:
         notification_msg = "Finished transcription for {} in {} seconds" \
             .format(name, round(time.time() - transcription_start_time))
 
-        if self.toolkit_UI_obj:
+        if self.toolkit_UI_obj is not None:
             self.toolkit_UI_obj.notify_via_os("Finished Transcription", notification_msg, notification_msg)
         else:
             logger.info(notification_msg)
@@ -2307,6 +2641,9 @@ class ToolkitOps:
 
         logger.debug('Loading text classifier model: {}'.format(model_name))
 
+        # import transformers only when we need it, since it takes a long time to import
+        from transformers import pipeline
+
         # get the zero-shot-classification pipeline
         # if this is an arm64 mac use mps as device
         if is_arm64_mac():
@@ -2541,7 +2878,7 @@ class ToolkitOps:
         # if this was successful, save the questions group to the transcription json file
         if questions_group is not None and isinstance(questions_group, dict) and transcription is not None:
             # get the id of the questions group
-            questions_group_id = list(questions_group.keys())[0]
+            questions_group_id = next(iter(questions_group))
 
             # push this change to the toolkit_ops_obj
             transcription.set_transcript_groups(group_id=questions_group_id, transcript_groups=questions_group)
@@ -3114,9 +3451,36 @@ class ToolkitOps:
             logger.debug('Resolve polling thread already running')
             return
 
+        # the NLE observers that need to be notified after the current poll
+        # - a single poll may detect the same change more than once (for eg. a timeline change also changes
+        # the timecode data), so we collect the actions here and notify each observer only once per poll,
+        # instead of making the UI update itself multiple times for the same change
+        pending_nle_actions = []
+
+        def notify_nle_observers(action):
+            if action not in pending_nle_actions:
+                pending_nle_actions.append(action)
+
+        def flush_nle_observers():
+            while pending_nle_actions:
+                self.notify_observers(pending_nle_actions.pop(0))
+
+        # while nothing changes in Resolve, we gradually poll less often (up to the max idle interval),
+        # but as soon as something changes, we go back to polling every 500ms
+        min_polling_interval = 500
+        max_idle_polling_interval = 2000
+        idle_polling_interval = min_polling_interval
+
+        # the hash of the data we got from resolve during the last poll
+        # - if the new data has the same hash, nothing changed, so there's nothing to compare
+        last_resolve_data_hash = None
+
         # do this continuously
         while True:
 
+            # notify the observers about whatever changed during the previous poll
+            flush_nle_observers()
+
             # keep updating the resolve_poll_num
             NLE.resolve_poll_num += 1
 
@@ -3152,183 +3516,191 @@ class ToolkitOps:
                     # actual polling happens here
                     resolve_data = self.resolve_api.get_resolve_data(silent=True)
 
-                    # for all the NLE variables related with resolve data,
-                    #  check if the data has changed and if so, update the NLE variable
-                    #  but if the polled data does not contain the key, also set the NLE variable to None
-                    #  also, if the global variable is not None and the polled data doesn't contain the key,
-                    #  set the global variable to None
-                    # also, make sure you notify the relevant observers that the data has changed
-
-                    # RESOLVE OBJECT CHANGE
-                    # if the resolve object has changed (for eg. from None to an object)
-                    try:
-                        if type(NLE.resolve) != type(resolve_data['resolve']):
-
-                            logger.debug('Resolve object changed from {} to {}.'
-                                         .format(type(NLE.resolve), type(resolve_data['resolve'])))
-
-                            # set the resolve object to whatever it is now
-                            NLE.resolve = resolve_data['resolve']
-
-                            # notify the observers that the resolve object has changed
-                            self.notify_observers('update_NLE_status')
-                            self.notify_observers('update_all_transcriptions')
-
-                            # if the resolve object is now None,
-                            # reset all and skip the rest of the polling
-                            if NLE.resolve is None:
-                                self.notify_observers('NLE_project_changed')
-                                self.notify_observers('NLE_timeline_changed')
-
-                                NLE.reset_all()
-                    except:
-                        import traceback
-                        logger.debug('Fail detected in resolve object change check.')
-                        logger.debug(traceback.format_exc())
-                        continue
-
-                    # RESOLVE TIMELINE NAME CHANGE
-                    # if the current project was already set and now it's no longer set in the polled data
-                    # or if the current project has changed
-                    try:
-                        if (NLE.current_project is not None and 'currentProject' not in resolve_data) \
-                                or NLE.current_project != resolve_data['currentProject']:
-                            # logger.debug('Current project changed from {} to {}.'
-                            #             .format(NLE.current_project, resolve_data['currentProject']))
-
-                            # set the current project to whatever it is now
-                            # but if the polled data doesn't contain the currentProject key, set it to None
-                            NLE.current_project = resolve_data[
-                                'currentProject'] if 'currentProject' in resolve_data else None
-
-                            # notify the observers that the project has changed
-                            self.notify_observers('NLE_project_changed')
-                            self.notify_observers('update_all_transcriptions')
-
-                    except Exception as e:
-                        logger.debug(e)
-                        logger.debug('Fail detected in resolve project change check.', exc_info=True)
-                        continue
-
-                    # if the current timeline was already set and now it's no longer set in the polled data
-                    # or if the current timeline has changed
-                    try:
-                        if (NLE.current_timeline is not None and 'currentTimeline' not in resolve_data) \
-                                or NLE.current_timeline != resolve_data['currentTimeline']:
-
-                            # logger.debug('Current timeline changed from {} to {}.'
-                            #             .format(NLE.current_timeline, resolve_data['currentTimeline']))
-
-                            # because we only want to trigger the timeline_changed event
-                            # if the name of the timeline has changed
-                            # but resolve_data['currentTimeline'] contains the entire timeline object,
-                            # including markers and other data that may have changed,
-                            # we need to focus on the name of the timeline
-
-                            # but first, if the polled data doesn't contain the currentTimeline key
-                            # yet the NLE.current_timeline was set before
-                            if NLE.current_timeline is not None and 'currentTimeline' not in resolve_data:
-
-                                # logger.debug('Current timeline changed from {} to None.'.format(NLE.current_timeline))
-
-                                # set the current timeline to None
-                                NLE.current_timeline = None
+                    # if the data didn't change since the last poll, skip all the comparisons below
+                    resolve_data_hash = self._get_resolve_data_hash(resolve_data)
+                    if resolve_data_hash is None or resolve_data_hash != last_resolve_data_hash:
+
+                        # for all the NLE variables related with resolve data,
+                        #  check if the data has changed and if so, update the NLE variable
+                        #  but if the polled data does not contain the key, also set the NLE variable to None
+                        #  also, if the global variable is not None and the polled data doesn't contain the key,
+                        #  set the global variable to None
+                        # also, make sure you notify the relevant observers that the data has changed
+
+                        # RESOLVE OBJECT CHANGE
+                        # if the resolve object has changed (for eg. from None to an object)
+                        try:
+                            if type(NLE.resolve) != type(resolve_data['resolve']):
+
+                                logger.debug('Resolve object changed from {} to {}.'
+                                             .format(type(NLE.resolve), type(resolve_data['resolve'])))
+
+                                # set the resolve object to whatever it is now
+                                NLE.resolve = resolve_data['resolve']
+
+                                # notify the observers that the resolve object has changed
+                                notify_nle_observers('update_NLE_status')
+                                notify_nle_observers('update_all_transcriptions')
+
+                                # if the resolve object is now None,
+                                # reset all and skip the rest of the polling
+                                if NLE.resolve is None:
+                                    notify_nle_observers('NLE_project_changed')
+                                    notify_nle_observers('NLE_timeline_changed')
+
+                                    NLE.reset_all()
+                        except:
+                            import traceback
+                            logger.debug('Fail detected in resolve object change check.')
+                            logger.debug(traceback.format_exc())
+                            continue
 
-                                self.notify_observers('NLE_timeline_changed')
+                        # RESOLVE TIMELINE NAME CHANGE
+                        # if the current project was already set and now it's no longer set in the polled data
+                        # or if the current project has changed
+                        try:
+                            if (NLE.current_project is not None and 'currentProject' not in resolve_data) \
+                                    or NLE.current_project != resolve_data['currentProject']:
+                                # logger.debug('Current project changed from {} to {}.'
+                                #             .format(NLE.current_project, resolve_data['currentProject']))
+
+                                # set the current project to whatever it is now
+                                # but if the polled data doesn't contain the currentProject key, set it to None
+                                NLE.current_project = resolve_data[
+                                    'currentProject'] if 'currentProject' in resolve_data else None
+
+                                # notify the observers that the project has changed
+                                notify_nle_observers('NLE_project_changed')
+                                notify_nle_observers('update_all_transcriptions')
+
+                        except Exception as e:
+                            logger.debug(e)
+                            logger.debug('Fail detected in resolve project change check.', exc_info=True)
+                            continue
 
-                            # if the polled data contains the currentTimeline key
-                            elif 'currentTimeline' in resolve_data \
-                                    and (type(NLE.current_timeline) != type(resolve_data['currentTimeline']) \
-                                         or ('name' in NLE.current_timeline and not 'name' in resolve_data[
-                                        'currentTimeline']) \
-                                         or ('name' in resolve_data[
-                                        'currentTimeline'] and not 'name' in NLE.current_timeline) \
-                                         or (NLE.current_timeline['name'] != resolve_data['currentTimeline']['name'])):
+                        # if the current timeline was already set and now it's no longer set in the polled data
+                        # or if the current timeline has changed
+                        try:
+                            if (NLE.current_timeline is not None and 'currentTimeline' not in resolve_data) \
+                                    or NLE.current_timeline != resolve_data['currentTimeline']:
 
                                 # logger.debug('Current timeline changed from {} to {}.'
                                 #             .format(NLE.current_timeline, resolve_data['currentTimeline']))
 
-                                # set the current timeline to whatever it is now
-                                NLE.current_timeline = resolve_data['currentTimeline'] \
-                                    if 'currentTimeline' in resolve_data else None
-
-                                # and notify the observers that the timeline has changed
-                                self.notify_observers('NLE_timeline_changed')
-                                self.notify_observers('NLE_timecode_data_changed')
-
-                            # if the polled data contains the currentTimeline key,
-                            # but the name of the timeline hasn't changed
-                            else:
-                                # set the current timeline to whatever it is now
-                                # but don't trigger the timeline_changed event
-                                NLE.current_timeline = resolve_data['currentTimeline'] \
-                                    if 'currentTimeline' in resolve_data else None
-
-                    except Exception as e:
-                        logger.debug(e)
-                        logger.debug('Fail detected in resolve timeline change check.', exc_info=True)
-                        continue
-
-                    # did the markers change?
-                    # (this only matters if the current timeline is not None
-                    # and if the current timeline has markers)
-                    if resolve_data is not None and type(resolve_data) is dict \
-                            and 'currentTimeline' in resolve_data \
-                            and type(resolve_data['currentTimeline']) is dict \
-                            and 'markers' in resolve_data['currentTimeline']:
-
-                        # first compare the types
-                        if type(NLE.current_timeline_markers) != type(resolve_data['currentTimeline']['markers']):
-                            # if the types are different, then the markers have changed
-                            self.notify_observers('NLE_markers_changed')
-
-                            NLE.current_timeline_markers = resolve_data['currentTimeline']['markers']
-
-                        # also do a key compare only for speed
-                        elif set(NLE.current_timeline_markers.keys()) != set(
-                                resolve_data['currentTimeline']['markers'].keys()):
-                            # if the keys are different, then the markers have changed
-                            self.notify_observers('NLE_markers_changed')
-
-                            NLE.current_timeline_markers = resolve_data['currentTimeline']['markers']
-
-                        # but if the marker keys are the same do a deeper compare
-                        elif NLE.current_timeline_markers != resolve_data['currentTimeline']['markers']:
-                            # if the keys are the same, but the values are different, then the markers have changed
-                            self.notify_observers('NLE_markers_changed')
-
-                            NLE.current_timeline_markers = resolve_data['currentTimeline']['markers']
+                                # because we only want to trigger the timeline_changed event
+                                # if the name of the timeline has changed
+                                # but resolve_data['currentTimeline'] contains the entire timeline object,
+                                # including markers and other data that may have changed,
+                                # we need to focus on the name of the timeline
+
+                                # but first, if the polled data doesn't contain the currentTimeline key
+                                # yet the NLE.current_timeline was set before
+                                if NLE.current_timeline is not None and 'currentTimeline' not in resolve_data:
+
+                                    # logger.debug('Current timeline changed from {} to None.'.format(NLE.current_timeline))
+
+                                    # set the current timeline to None
+                                    NLE.current_timeline = None
+
+                                    notify_nle_observers('NLE_timeline_changed')
+
+                                # if the polled data contains the currentTimeline key
+                                elif 'currentTimeline' in resolve_data \
+                                        and (type(NLE.current_timeline) != type(resolve_data['currentTimeline']) \
+                                             or ('name' in NLE.current_timeline and not 'name' in resolve_data[
+                                            'currentTimeline']) \
+                                             or ('name' in resolve_data[
+                                            'currentTimeline'] and not 'name' in NLE.current_timeline) \
+                                             or (NLE.current_timeline['name']
+                                                 != resolve_data['currentTimeline']['name'])):
+
+                                    # logger.debug('Current timeline changed from {} to {}.'
+                                    #             .format(NLE.current_timeline, resolve_data['currentTimeline']))
+
+                                    # set the current timeline to whatever it is now
+                                    NLE.current_timeline = resolve_data['currentTimeline'] \
+                                        if 'currentTimeline' in resolve_data else None
+
+                                    # and notify the observers that the timeline has changed
+                                    notify_nle_observers('NLE_timeline_changed')
+                                    notify_nle_observers('NLE_timecode_data_changed')
+
+                                # if the polled data contains the currentTimeline key,
+                                # but the name of the timeline hasn't changed
+                                else:
+                                    # set the current timeline to whatever it is now
+                                    # but don't trigger the timeline_changed event
+                                    NLE.current_timeline = resolve_data['currentTimeline'] \
+                                        if 'currentTimeline' in resolve_data else None
+
+                        except Exception as e:
+                            logger.debug(e)
+                            logger.debug('Fail detected in resolve timeline change check.', exc_info=True)
+                            continue
 
-                    else:
-                        NLE.current_timeline_markers = None
-
-                    #  updates the currentBin
-                    if (NLE.current_bin is not None and NLE.current_bin != '' and 'currentBin' not in resolve_data) \
-                            or NLE.current_bin != resolve_data['currentBin']:
-                        NLE.current_bin = resolve_data['currentBin'] if 'currentBin' in resolve_data else ''
-                        self.notify_observers('NLE_bin_changed')
-
-                    # update current playhead timecode
-                    if (NLE.current_tc is not None and 'currentTC' not in resolve_data) \
-                            or NLE.current_tc != resolve_data['currentTC']:
-                        NLE.current_tc = resolve_data['currentTC']
-                        self.notify_observers('NLE_tc_changed')
-
-                    # update current playhead timecode
-                    if (NLE.current_timeline_fps is not None and 'currentTimelineFPS' not in resolve_data) \
-                            or NLE.current_timeline_fps != resolve_data['currentTimelineFPS']:
-                        NLE.current_timeline_fps = resolve_data['currentTimelineFPS']
-                        self.notify_observers('NLE_timecode_data_changed')
-
-                    # update start_tc timecode
-                    if (NLE.current_start_tc is not None
-                        and 'currentTimeline' not in resolve_data
-                        and 'startTC' not in resolve_data['currentTimeline']) \
-                            or (resolve_data['currentTimeline'] is not None \
-                            and NLE.current_start_tc != resolve_data['currentTimeline']['startTC']):
-                        NLE.current_start_tc = \
-                            resolve_data['currentTimeline']['startTC'] if isinstance(resolve_data, dict) else None
-                        self.notify_observers('NLE_timecode_data_changed')
+                        # did the markers change?
+                        # (this only matters if the current timeline is not None
+                        # and if the current timeline has markers)
+                        if resolve_data is not None and type(resolve_data) is dict \
+                                and 'currentTimeline' in resolve_data \
+                                and type(resolve_data['currentTimeline']) is dict \
+                                and 'markers' in resolve_data['currentTimeline']:
+
+                            # first compare the types
+                            if type(NLE.current_timeline_markers) != type(resolve_data['currentTimeline']['markers']):
+                                # if the types are different, then the markers have changed
+                                notify_nle_observers('NLE_markers_changed')
+
+                                NLE.current_timeline_markers = resolve_data['currentTimeline']['markers']
+
+                            # also do a key compare only for speed
+                            elif set(NLE.current_timeline_markers.keys()) != set(
+                                    resolve_data['currentTimeline']['markers'].keys()):
+                                # if the keys are different, then the markers have changed
+                                notify_nle_observers('NLE_markers_changed')
+
+                                NLE.current_timeline_markers = resolve_data['currentTimeline']['markers']
+
+                            # but if the marker keys are the same do a deeper compare
+                            elif NLE.current_timeline_markers != resolve_data['currentTimeline']['markers']:
+                                # if the keys are the same, but the values are different, then the markers have changed
+                                notify_nle_observers('NLE_markers_changed')
+
+                                NLE.current_timeline_markers = resolve_data['currentTimeline']['markers']
+
+                        else:
+                            NLE.current_timeline_markers = None
+
+                        #  updates the currentBin
+                        if (NLE.current_bin is not None and NLE.current_bin != ''
+                            and 'currentBin' not in resolve_data) \
+                                or NLE.current_bin != resolve_data['currentBin']:
+                            NLE.current_bin = resolve_data['currentBin'] if 'currentBin' in resolve_data else ''
+                            notify_nle_observers('NLE_bin_changed')
+
+                        # update current playhead timecode
+                        if (NLE.current_tc is not None and 'currentTC' not in resolve_data) \
+                                or NLE.current_tc != resolve_data['currentTC']:
+                            NLE.current_tc = resolve_data['currentTC']
+                            notify_nle_observers('NLE_tc_changed')
+
+                        # update current playhead timecode
+                        if (NLE.current_timeline_fps is not None and 'currentTimelineFPS' not in resolve_data) \
+                                or NLE.current_timeline_fps != resolve_data['currentTimelineFPS']:
+                            NLE.current_timeline_fps = resolve_data['currentTimelineFPS']
+                            notify_nle_observers('NLE_timecode_data_changed')
+
+                        # update start_tc timecode
+                        if (NLE.current_start_tc is not None
+                            and 'currentTimeline' not in resolve_data
+                            and 'startTC' not in resolve_data['currentTimeline']) \
+                                or (resolve_data['currentTimeline'] is not None \
+                                and NLE.current_start_tc != resolve_data['currentTimeline']['startTC']):
+                            NLE.current_start_tc = \
+                                resolve_data['currentTimeline']['startTC'] if isinstance(resolve_data, dict) else None
+                            notify_nle_observers('NLE_timecode_data_changed')
+
+                        last_resolve_data_hash = resolve_data_hash
 
                     # was there a previous error?
                     if NLE.resolve is not None and NLE.resolve_error > 0:
@@ -3351,11 +3723,20 @@ class ToolkitOps:
                     NLE.resolve_error += 1
 
                 # how often do we poll resolve?
-                polling_interval = 500
+                # if anything changed during this poll, reset the interval, otherwise back off
+                if pending_nle_actions:
+                    idle_polling_interval = min_polling_interval
+                else:
+                    idle_polling_interval = min(idle_polling_interval * 2, max_idle_polling_interval)
+
+                polling_interval = idle_polling_interval
 
                 # if any errors occurred
                 if NLE.resolve_error:
 
+                    # start from the minimum interval once the connection is re-established
+                    idle_polling_interval = min_polling_interval
+
                     # let the user know that there's an error, and throttle the polling_interval
 
                     # after 15+ errors, deduce that Resolve will not be started this session, so stop polling
@@ -3400,6 +3781,9 @@ class ToolkitOps:
 
                     # logger.debug('Polling time: {} seconds'.format(round(time.time() - polling_start_time), 2))
 
+                # notify the observers about whatever changed during this poll
+                flush_nle_observers()
+
                 if polling_interval is None:
                     self.polling_resolve = False
                     return False
@@ -3411,6 +3795,27 @@ class ToolkitOps:
                 # take a 0.5-second break before trying this again
                 time.sleep(0.5)
 
+    @staticmethod
+    def _get_resolve_data_hash(resolve_data):
+        """
+        This returns a hash of the data polled from resolve, so that we can quickly tell if anything changed,
+        without comparing all the nested dicts (timeline markers etc.) one by one
+        Returns None if the data cannot be hashed
+        """
+
+        if not isinstance(resolve_data, dict):
+            return None
+
+        try:
+            # the resolve object itself can't be serialized, so we only take its type into account
+            return hash((
+                type(resolve_data.get('resolve', None)),
+                json_utils.dumps({k: v for k, v in resolve_data.items() if k != 'resolve'}, sort_keys=True)
+            ))
+
+        except Exception:
+            return None
+
     def resolve_check_timeline(self, resolve_data, toolkit_UI_obj):
         '''
         This checks if a timeline is available
@@ -3565,31 +3970,27 @@ class ToolkitOps:
             # start the render process via CLI
             process = subprocess.Popen(command)
 
-            def check_process(wait_time=2):
+            def check_process(wait_time=22):
                 """
                 This function checks if the render command was successful
                 """
-                # wait a bit before checking if the process is still running
-                time.sleep(wait_time)
 
-                check_times = 0
-
-                # if the process is still running, check again after a bit
-                while process.poll() is None and check_times < 10:
-                    time.sleep(wait_time)
-                    check_times += 1
+                # block this thread (not the UI) until the process exits or until the wait time passes,
+                # instead of waking up every few seconds to poll the process
+                try:
+                    exit_code = process.wait(timeout=wait_time)
 
-                if check_times >= 10:
+                except subprocess.TimeoutExpired:
                     logger.info("CLI subprocess is still running after {} seconds. Assuming render is running. "
-                                "Aborting check function to save resources.".format(wait_time * check_times))
+                                "Aborting check function to save resources.".format(wait_time))
+                    return
 
-                # check one more time if the process is still running
-                exit_code = process.poll()
-                if exit_code != 0 and exit_code is not None:
+                if exit_code != 0:
                     logger.error(f"CLI subprocess exited with error code {exit_code}")
 
             # Start the subprocess check in a separate thread
-            thread = Thread(target=check_process)
+            # (daemon, so it never keeps the app from closing while the render is still running)
+            thread = Thread(target=check_process, daemon=True)
             thread.start()
 
             # return the render job info
@@ -3661,8 +4062,7 @@ class ToolkitOps:
                 # take each marker from timeline and get its color
                 # but also add a an empty string to the list to allow the user to render all markers
                 current_timeline_marker_colors = [' '] + sorted(
-                    list(set([NLE.current_timeline['markers'][marker]['color']
-                              for marker in NLE.current_timeline['markers']])))
+                    {marker['color'] for marker in NLE.current_timeline['markers'].values()})
 
             # if no markers exist, cancel operation and let the user know that there are no markers to render
             marker_color = None
@@ -15,6 +15,7 @@ from threading import Timer
 from timecode import Timecode
 
 from storytoolkitai.core.logger import logger
+from storytoolkitai.core import json_utils
 from storytoolkitai.core.toolkit_ops.timecode import sec_to_tc
 
 from storytoolkitai import USER_DATA_PATH
@@ -408,7 +409,9 @@ class Transcription:
 
     @staticmethod
     def get_transcription_path_id(transcription_file_path):
-        return hashlib.md5(transcription_file_path.encode('utf-8')).hexdigest()
+        # this is only used to identify the transcription during runtime (windows, observers etc.),
+        # so a short blake2s digest is enough and much cheaper than md5
+        return hashlib.blake2s(transcription_file_path.encode('utf-8'), digest_size=8).hexdigest()
 
     def generate_id(self):
         """
@@ -440,12 +443,9 @@ class Transcription:
 
                 logger.debug("Loading transcription file {}".format(self.__transcription_file_path))
 
-                with codecs.open(self.__transcription_file_path, 'r', 'utf-8-sig') as json_file:
-                    self._data = json.load(json_file)
-
-                    # let's make a deep copy of the data
-                    # so that we can manipulate it without changing the original data
-                    self._data = copy.deepcopy(self._data)
+                # the freshly parsed data isn't shared with anything else,
+                # so there's no need to deep copy it before manipulating it
+                self._data = json_utils.load_file(self.__transcription_file_path)
 
             # in case we get JSONDecodeError, we assume that the file is not a valid JSON file
             except json.decoder.JSONDecodeError:
@@ -466,7 +466,8 @@ class Transcription:
             if attribute in self._data:
 
                 # process the value for the attribute
-                attribute_value = self._process_attribute(attribute, copy.deepcopy(self._data[attribute]))
+                # and remove it from the data (no copy needed, since nothing else references the value)
+                attribute_value = self._process_attribute(attribute, self._data.pop(attribute))
 
                 # if there's nothing left to set, continue
                 if attribute_value is None:
@@ -475,9 +476,6 @@ class Transcription:
                 # set the attribute, but also process it
                 setattr(self, '_'+attribute, attribute_value)
 
-                # and remove it from the data
-                del self._data[attribute]
-
             # if the known attribute is not in the json,
             # set the attribute to None so we can still access it
             else:
@@ -1050,7 +1048,7 @@ class Transcription:
         transcription_dict = self.to_dict()
 
         # calculate the hash (also sort the keys to make sure the hash is consistent)
-        self._last_hash = hashlib.md5(json.dumps(transcription_dict, sort_keys=True).encode('utf-8')).hexdigest()
+        self._last_hash = hashlib.md5(json_utils.dumps(transcription_dict, sort_keys=True)).hexdigest()
 
         return self._last_hash
 
@@ -2063,10 +2061,10 @@ class TranscriptionUtils:
                 logger.debug('Copied transcription file to backup: {}'.format(backup_transcription_file_path))
 
         # encode the transcription json (do this before writing to the file, to make sure it's valid)
-        transcription_json_encoded = json.dumps(transcription_data, indent=4)
+        transcription_json_encoded = json_utils.dumps(transcription_data, indent=True)
 
         # write the transcription json to the file
-        with open(transcription_file_path, 'w', encoding='utf-8') as outfile:
+        with open(transcription_file_path, 'wb') as outfile:
             outfile.write(transcription_json_encoded)
 
         logger.debug('Saved transcription to file: {}'.format(transcription_file_path))
@@ -2278,28 +2276,29 @@ class TranscriptionUtils:
 
         transcript_segments = TranscriptionUtils.filter_segments(transcript_segments, filter_meta)
 
-        with open(srt_file_path, "w", encoding="utf-8") as srt_file:
-            i = 1
-            for segment in transcript_segments:
+        format_srt_timestamp = TranscriptionUtils.format_srt_timestamp
+
+        # build the srt lines in memory first,
+        # so that we write the whole file at once instead of flushing each segment separately
+        srt_lines = []
+        for i, segment in enumerate(transcript_segments, start=1):
 
-                start_str = TranscriptionUtils.format_srt_timestamp(
-                    segment.start, always_include_hours=True, decimal_marker=',')
+            start_str = format_srt_timestamp(segment.start, always_include_hours=True, decimal_marker=',')
 
-                end_str = TranscriptionUtils.format_srt_timestamp(
-                    segment.end, always_include_hours=True, decimal_marker=',')
+            end_str = format_srt_timestamp(segment.end, always_include_hours=True, decimal_marker=',')
 
-                text_str = segment.text.strip().replace('-->', '->')
+            text_str = segment.text.strip().replace('-->', '->')
 
-                # write srt lines
-                print(
-                    f"{i}\n"
-                    f"{start_str} --> "
-                    f"{end_str}\n"
-                    f"{text_str}\r\n",
-                    file=srt_file,
-                    flush=True,
-                )
-                i += 1
+            srt_lines.append(
+                f"{i}\n"
+                f"{start_str} --> "
+                f"{end_str}\n"
+                f"{text_str}\r\n\n"
+            )
+
+        # write srt lines
+        with open(srt_file_path, "w", encoding="utf-8") as srt_file:
+            srt_file.write(''.join(srt_lines))
 
     @staticmethod
     def write_txt(transcript_segments: list, txt_file_path: str, filter_meta=True):
@@ -2313,14 +2312,9 @@ class TranscriptionUtils:
 
         transcript_segments = TranscriptionUtils.filter_segments(transcript_segments, filter_meta)
 
+        # write txt lines (all at once, instead of flushing each segment separately)
         with open(txt_file_path, "w", encoding="utf-8") as txt_file:
-            for segment in transcript_segments:
-                # write txt lines
-                print(
-                    f"{segment.text.strip()}",
-                    file=txt_file,
-                    flush=True,
-                )
+            txt_file.write(''.join([f"{segment.text.strip()}\n" for segment in transcript_segments]))
 
     @staticmethod
     def write_avid_ds(
@@ -2379,14 +2373,12 @@ class TranscriptionUtils:
                 flush=True
             )
 
-            # write subtitle lines
-            for segment in transcript_segments:
-                print(
-                    f"{format_timecode_line(segment.start, segment.end, timeline_fps, timeline_start_tc)}\n"
-                    f"{segment.text.strip()}\n",
-                    file=avid_ds_file,
-                    flush=True,
-                )
+            # write subtitle lines (all at once, instead of flushing each segment separately)
+            avid_ds_file.write(''.join([
+                f"{format_timecode_line(segment.start, segment.end, timeline_fps, timeline_start_tc)}\n"
+                f"{segment.text.strip()}\n\n"
+                for segment in transcript_segments
+            ]))
 
             # write subtitle end
             print(
@@ -2606,13 +2598,10 @@ class TranscriptionUtils:
 
             header = header.replace('{' + variable + '}', str(value))
 
-        # write the header to the export file
-        with open(export_file_path, "w", encoding="utf-8") as export_file:
-            print(
-                f'{header}',
-                file=export_file,
-                flush=True
-            )
+        # collect everything that needs to be written to the export file,
+        # so that we can write it all at once at the end (instead of re-opening the file for each segment)
+        # - start with the header
+        export_parts = [f'{header}\n']
 
         # get the segment condition from the custom template
         segment_condition = custom_template.get('segment_condition', '')
@@ -2692,14 +2681,8 @@ class TranscriptionUtils:
 
                 filled_segment_template = filled_segment_template.replace('{' + variable + '}', str(value))
 
-            # write the segment to the export file
-            with open(export_file_path, "a", encoding="utf-8") as export_file:
-                print(
-                    f'{filled_segment_template}',
-                    file=export_file,
-                    flush=True,
-                    end=segment_separator
-                )
+            # add the segment to the export
+            export_parts.append(f'{filled_segment_template}{segment_separator}')
 
         # lastly, get the footer from the custom template
         footer = custom_template.get('footer', '')
@@ -2708,13 +2691,12 @@ class TranscriptionUtils:
         for variable, value in template_variables.items():
             footer = footer.replace('{' + variable + '}', str(value))
 
-        # write the footer to the export file
-        with open(export_file_path, "a", encoding="utf-8") as export_file:
-            print(
-                f'{footer}',
-                file=export_file,
-                flush=True
-            )
+        # add the footer to the export
+        export_parts.append(f'{footer}\n')
+
+        # write everything to the export file
+        with open(export_file_path, "w", encoding="utf-8") as export_file:
+            export_file.write(''.join(export_parts))
 
         logger.debug('Exported transcription using custom template "{}" to {}'
                      .format(os.path.basename(custom_template_file_path), custom_template_file_path))
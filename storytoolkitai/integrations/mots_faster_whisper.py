@@ -0,0 +1,232 @@
+"""
+This is a thin wrapper around faster-whisper (CTranslate2) that exposes the same transcribe() interface
+and result format as mots_whisper, so that the toolkit can use either backend interchangeably.
+
+faster-whisper is an optional dependency - if it's not installed, FASTER_WHISPER_AVAILABLE will be False
+and the toolkit will continue using the OpenAI Whisper backend.
+"""
+
+import logging
+from typing import Optional, Union
+
+import numpy as np
+import torch
+
+from whisper.tokenizer import TO_LANGUAGE_CODE, LANGUAGES
+
+try:
+    from faster_whisper import WhisperModel
+    FASTER_WHISPER_AVAILABLE = True
+
+except ImportError:
+    WhisperModel = None
+    FASTER_WHISPER_AVAILABLE = False
+
+# the batched pipeline is only available in newer faster-whisper versions
+try:
+    from faster_whisper import BatchedInferencePipeline
+
+except ImportError:
+    BatchedInferencePipeline = None
+
+logger = logging.getLogger('StAI')
+
+# roughly how much GPU memory each batched audio chunk needs during inference (in bytes)
+# this is used to lower the batch size on GPUs with less free memory
+BATCH_ITEM_GPU_MEMORY = 512 * 1024 * 1024
+
+
+def get_compute_type(device: str) -> str:
+    """
+    Returns the best compute type for the passed device, depending on the GPU capabilities:
+    int8 weights with float16 activations on GPUs with tensor cores (compute capability 7.0+),
+    float16 on older GPUs that support it (6.x) and plain int8 on everything else (incl. CPU)
+    """
+
+    if not str(device).startswith('cuda') or not torch.cuda.is_available():
+        return 'int8'
+
+    try:
+        major, _ = torch.cuda.get_device_capability(0)
+
+    except Exception as e:
+        logger.debug('Cannot get GPU compute capability: {}'.format(e))
+        return 'int8'
+
+    if major >= 7:
+        return 'int8_float16'
+
+    elif major >= 6:
+        return 'float16'
+
+    return 'int8'
+
+
+def get_max_batch_size(device: str, batch_size: int) -> int:
+    """
+    Returns the batch size that fits into the free memory of the passed device,
+    but never more than the requested batch size
+    """
+
+    if not batch_size or not str(device).startswith('cuda') or not torch.cuda.is_available():
+        return batch_size
+
+    try:
+        free_memory, _ = torch.cuda.mem_get_info()
+
+    except Exception as e:
+        logger.debug('Cannot get free GPU memory: {}'.format(e))
+        return batch_size
+
+    return max(1, min(batch_size, int(free_memory // BATCH_ITEM_GPU_MEMORY)))
+
+
+def load_model(name: str, device: str = 'cpu', compute_type: Optional[str] = None, **kwargs):
+    """
+    Loads a faster-whisper model and wraps it so it can be used like a mots_whisper model
+    """
+
+    if not FASTER_WHISPER_AVAILABLE:
+        raise ImportError('faster-whisper is not installed.')
+
+    return FasterWhisper(name=name, device=device, compute_type=compute_type, **kwargs)
+
+
+class FasterWhisper:
+
+    def __init__(self, name: str, device: str = 'cpu', compute_type: Optional[str] = None, batch_size: int = 16,
+                 **kwargs):
+
+        # CTranslate2 only knows about the device type, not about torch.device objects
+        self.device = 'cuda' if str(device).startswith('cuda') else 'cpu'
+
+        self.compute_type = compute_type if compute_type else get_compute_type(self.device)
+
+        self.name = name
+
+        logger.debug('Loading faster-whisper {} model on {} using {}.'
+                     .format(name, self.device, self.compute_type))
+
+        self.model = WhisperModel(name, device=self.device, compute_type=self.compute_type, **kwargs)
+
+        # if the batched pipeline is available, we'll use it to VAD-split the audio into chunks
+        # and run them through the model in batches instead of one 30s window at a time
+        self.batch_size = batch_size
+        self.batched_pipeline = BatchedInferencePipeline(model=self.model) \
+            if BatchedInferencePipeline is not None and self.batch_size and self.batch_size > 1 else None
+
+    @property
+    def is_multilingual(self):
+        return self.model.model.is_multilingual
+
+    def transcribe(
+            self,
+            audio: Union[str, np.ndarray],
+            *,
+            task: str = 'transcribe',
+            verbose: Optional[bool] = None,
+
+            # StoryToolkitAI additions
+            queue_id: Optional[str] = None,
+            toolkit_ops_obj: object = None,
+            audio_segment_duration: int = None,
+            total_duration: int = None,
+            previous_progress: int = 0,
+            # end StoryToolkitAI additions
+
+            **decode_options
+    ):
+        """
+        Transcribe the audio using faster-whisper and return the result in the same format as mots_whisper
+        """
+
+        transcribe_options = dict()
+
+        # faster-whisper only accepts language codes, so convert the language names (if any)
+        language = decode_options.get('language', None)
+        if isinstance(language, str) and language:
+            language = language.lower()
+            transcribe_options['language'] = \
+                TO_LANGUAGE_CODE.get(language, language if language in LANGUAGES else None)
+
+        # these options have the same name in both backends
+        for option in ['initial_prompt', 'beam_size', 'best_of', 'temperature', 'word_timestamps',
+                       'compression_ratio_threshold', 'no_speech_threshold', 'condition_on_previous_text',
+                       'prepend_punctuations', 'append_punctuations']:
+            if decode_options.get(option, None) is not None:
+                transcribe_options[option] = decode_options[option]
+
+        # but this one is named differently
+        if decode_options.get('logprob_threshold', None) is not None:
+            transcribe_options['log_prob_threshold'] = decode_options['logprob_threshold']
+
+        # the segments are yielded as they are transcribed
+        # (use the batched pipeline if we have one, unless batching was disabled for this call)
+        batch_size = get_max_batch_size(self.device, decode_options.get('batch_size', self.batch_size))
+        if self.batched_pipeline is not None and batch_size and batch_size > 1:
+            segments_generator, info = self.batched_pipeline.transcribe(
+                audio, task=task, batch_size=batch_size, **transcribe_options)
+
+        else:
+            segments_generator, info = self.model.transcribe(audio, task=task, **transcribe_options)
+
+        all_segments = []
+        for segment in segments_generator:
+
+            # gracefully cancel if the queue item has been canceled
+            if queue_id is not None \
+                    and toolkit_ops_obj.processing_queue.get_status(queue_id=queue_id) \
+                    in [None, False, 'canceling', 'canceled']:
+                return dict(
+                    text=''.join([s['text'] for s in all_segments]),
+                    segments=all_segments,
+                    language=info.language,
+                    status='canceled'
+                )
+
+            new_segment = {
+                'id': len(all_segments),
+                'seek': segment.seek,
+                'start': segment.start,
+                'end': segment.end,
+                'text': segment.text,
+                'tokens': segment.tokens,
+                'temperature': segment.temperature,
+                'avg_logprob': segment.avg_logprob,
+                'compression_ratio': segment.compression_ratio,
+                'no_speech_prob': segment.no_speech_prob,
+            }
+
+            if segment.words is not None:
+                new_segment['words'] = [
+                    {'word': word.word, 'start': word.start, 'end': word.end, 'probability': word.probability}
+                    for word in segment.words
+                ]
+
+            all_segments.append(new_segment)
+
+            if verbose:
+                logger.debug('[{:.3f} --> {:.3f}] {}'.format(segment.start, segment.end, segment.text))
+
+            # add the text to the queue item variable (to make it available in the UI)
+            if queue_id is not None:
+                toolkit_ops_obj.processing_queue.update_output(queue_id=queue_id, output=segment.text)
+
+            # calculate the progress
+            progress = min(100, int((segment.end / info.duration) * 100)) if info.duration else 0
+
+            # but if a total duration and an audio segment duration were passed
+            # take that into account
+            if total_duration and audio_segment_duration:
+                progress = previous_progress + int(progress * (audio_segment_duration / total_duration))
+
+            # update the progress in the app
+            if queue_id is not None:
+                toolkit_ops_obj.processing_queue.update_queue_item(queue_id=queue_id,
+                                                                   save_to_file=False, progress=progress)
+
+        return dict(
+            text=''.join([s['text'] for s in all_segments]),
+            segments=all_segments,
+            language=info.language,
+        )
@@ -11,6 +11,7 @@ import os
 import platform
 import json
 from threading import Timer
+from types import MappingProxyType
 
 from timecode import Timecode
 
@@ -734,7 +735,8 @@ class MotsResolve:
                                            {},
                                        }
 
-    RESOLVE_MARKER_COLORS = {
+    # (read-only, since it's shared by everything that uses MotsResolve)
+    RESOLVE_MARKER_COLORS = MappingProxyType({
         "Blue": "#0000FF",
         "Cyan": "#00CED0",
         "Green": "#00AD00",
@@ -751,7 +753,13 @@ class MotsResolve:
         "Sand": "#C4915E",
         "Cocoa": "#6E5143",
         "Cream": "#F5EBE1"
-    }
+    })
+
+    # the same marker colors, but already parsed to (r, g, b) int tuples
+    RESOLVE_MARKER_COLORS_RGB = MappingProxyType({
+        color_name: tuple(int(color_hex[i:i + 2], 16) for i in (1, 3, 5))
+        for color_name, color_hex in RESOLVE_MARKER_COLORS.items()
+    })
 
     def render_markers(self, marker_color, target_dir, add_timestamp=False, stills=False, start_render=False,
                        render_preset='h264_LQ3000', save_marker_data=False, marker_id=None, starts_with=None):
@@ -6,6 +6,7 @@ import argparse
 import os
 import traceback
 import warnings
+from functools import lru_cache
 from typing import TYPE_CHECKING, List, Optional, Tuple, Union
 
 import numpy as np
@@ -18,7 +19,8 @@ from whisper.audio import (
     N_FRAMES,
     N_SAMPLES,
     SAMPLE_RATE,
-    log_mel_spectrogram,
+    N_FFT,
+    mel_filters,
     pad_or_trim,
     load_audio,
 )
@@ -59,6 +61,47 @@ if TYPE_CHECKING:
 import logging
 logger = logging.getLogger('StAI')
 
+
+@lru_cache(maxsize=None)
+def hann_window(device) -> torch.Tensor:
+    """
+    Returns the hann window used for the STFT, created only once for each device
+    (the mel filters are already cached by whisper.audio.mel_filters)
+    """
+    return torch.hann_window(N_FFT, device=device)
+
+
+def log_mel_spectrogram(
+    audio: Union[str, np.ndarray, torch.Tensor],
+    n_mels: int = 80,
+    padding: int = 0,
+    device: Optional[Union[str, torch.device]] = None,
+):
+    """
+    This is the same as whisper.audio.log_mel_spectrogram,
+    but it uses the cached hann window instead of creating a new one (and moving it to the device) on each call
+    """
+    if not torch.is_tensor(audio):
+        if isinstance(audio, str):
+            audio = load_audio(audio)
+        audio = torch.from_numpy(audio)
+
+    if device is not None:
+        audio = audio.to(device)
+    if padding > 0:
+        audio = torch.nn.functional.pad(audio, (0, padding))
+    stft = torch.stft(audio, N_FFT, HOP_LENGTH, window=hann_window(audio.device), return_complex=True)
+    magnitudes = stft[..., :-1].abs() ** 2
+
+    filters = mel_filters(audio.device, n_mels)
+    mel_spec = filters @ magnitudes
+
+    log_spec = torch.clamp(mel_spec, min=1e-10).log10()
+    log_spec = torch.maximum(log_spec, log_spec.max() - 8.0)
+    log_spec = (log_spec + 4.0) / 4.0
+    return log_spec
+
+
 def transcribe(
     model: "Whisper",
     audio: Union[str, np.ndarray, torch.Tensor],
@@ -182,7 +225,9 @@ def transcribe(
         decode_options["fp16"] = False
 
     # Pad 30-seconds of silence to the input audio, for slicing
-    mel = log_mel_spectrogram(audio, model.dims.n_mels, padding=N_SAMPLES)
+    # (compute the mel spectrogram directly on the model device, so the STFT runs on the GPU if there is one
+    # and the mel segments don't need to be moved to the device one by one later)
+    mel = log_mel_spectrogram(audio, model.dims.n_mels, padding=N_SAMPLES, device=model.device)
     content_frames = mel.shape[-1] - N_FRAMES
     content_duration = float(content_frames * HOP_LENGTH / SAMPLE_RATE)
 
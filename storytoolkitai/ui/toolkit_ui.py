@@ -7,6 +7,9 @@ import subprocess
 import webbrowser
 import sys
 import random
+import threading
+
+from queue import Queue
 
 from requests import get
 import time
@@ -23,8 +26,6 @@ from PIL import Image, ImageTk
 
 from tkinter import filedialog, simpledialog, messagebox, font
 
-from whisper import available_models as whisper_available_models
-
 from .menu import UImenus
 
 
@@ -114,6 +115,17 @@ class toolkit_UI():
     # these are the marker colors used in Resolve
     resolve_marker_colors = MotsResolve.RESOLVE_MARKER_COLORS
 
+    # and their names, for the option menus
+    resolve_marker_color_names = list(resolve_marker_colors.keys())
+
+    # the app icon image - loaded only once (see UI_set_icon) and shared by all the windows
+    _icon_photo = None
+
+    # the OS notifications waiting to be shown by the notifications thread (see notify_via_os)
+    _os_notifications = Queue()
+    _os_notifications_thread = None
+    _os_notifications_lock = threading.Lock()
+
     class AppItemsUI:
         """
         This contains the Preferences and About windows.
@@ -612,8 +624,7 @@ class toolkit_UI():
                                                       **toolkit_UI.ctk_form_label_settings)
             default_marker_color_input = ctk.CTkOptionMenu(resolve_prefs_frame,
                                                            variable=default_marker_color_var,
-                                                           values=list(
-                                                               self.toolkit_UI_obj.resolve_marker_colors.keys()),
+                                                           values=toolkit_UI.resolve_marker_color_names,
                                                            **toolkit_UI.ctk_form_entry_settings)
             # TRANSCRIPTION RENDER PRESET
             transcription_render_preset = \
@@ -1502,21 +1513,15 @@ class toolkit_UI():
 
     def update_wait(self):
 
-        n = 0
-        # keep checking if the stAI object has finished checking for updates
-        while n < 5:
-            time.sleep(1)
-
-            if self.stAI.update_available:
-                return self.update_popup()
-
-            if self.stAI.update_available is False:
-                logger.debug('No update available.')
-                return
+        # wait (up to 5 seconds) for the stAI object to finish checking for updates
+        if not self.stAI.update_check_done.wait(timeout=5):
+            logger.debug('Timed out update_wait after {} seconds.'.format(5))
+            return
 
-            n += 1
+        if self.stAI.update_available:
+            return self.update_popup()
 
-        logger.debug('Timed out update_wait after {} seconds.'.format(n))
+        logger.debug('No update available.')
 
     def update_popup(self):
 
@@ -1569,7 +1574,8 @@ class toolkit_UI():
                         message_log='Unable to update via git',
                     )
 
-            action_buttons = [{'text': 'Update', 'command': lambda: update_via_git()}]
+            # (the update runs in a separate thread, so that the UI doesn't freeze while git is working)
+            action_buttons = [{'text': 'Update', 'command': lambda: Thread(target=update_via_git, daemon=True).start()}]
 
         # read the CHANGELOG.md file from github
         changelog_file = get('https://raw.githubusercontent.com/octimot/StoryToolkitAI/master/CHANGELOG.md')
@@ -1708,8 +1714,12 @@ class toolkit_UI():
         # add icon
         try:
 
-            photo = tk.PhotoImage(file=os.path.join(self.UI_folder, 'StoryToolkitAI.png'))
-            window.wm_iconphoto(False, photo)
+            # load the icon image only the first time we need it
+            # (it's kept on the class so that Tk doesn't garbage collect it)
+            if toolkit_UI._icon_photo is None:
+                toolkit_UI._icon_photo = tk.PhotoImage(file=os.path.join(self.UI_folder, 'StoryToolkitAI.png'))
+
+            window.wm_iconphoto(False, toolkit_UI._icon_photo)
 
             # set bar icon for windows
             if sys.platform == 'win32':
@@ -2978,7 +2988,7 @@ class toolkit_UI():
         self.root.resizable(False, False)
 
         # update the window after it's been created
-        self.root.after(500, self.update_main_window())
+        self.root.after(500, self.update_main_window)
 
         # add the window observer that will update the main window if the NLE status changes
         def add_main_window_observers():
@@ -4546,7 +4556,7 @@ class toolkit_UI():
         if not window_id:
 
             # hash the file path to get a unique window id
-            window_id = 'text_file_' + str(hashlib.md5(file_path.encode()).hexdigest())
+            window_id = 'text_file_' + hashlib.blake2s(file_path.encode('utf-8'), digest_size=8).hexdigest()
 
         # now open the text window if it doesn't exist
         if not self.get_window_by_id(window_id):
@@ -6069,7 +6079,8 @@ class toolkit_UI():
         form_vars['model_name_var'] = \
             model_name_var = tk.StringVar(basic_frame, value=model_selected)
         model_name_label = ctk.CTkLabel(basic_frame, text='Model', **self.ctk_form_label_settings)
-        model_name_input = ctk.CTkOptionMenu(basic_frame, variable=model_name_var, values=whisper_available_models(),
+        model_name_input = ctk.CTkOptionMenu(basic_frame, variable=model_name_var,
+                                             values=self.toolkit_ops_obj.get_whisper_available_models(),
                                              **self.ctk_form_entry_settings)
 
         # SPEAKER OPTIONS
@@ -9452,8 +9463,7 @@ class toolkit_UI():
                     .nametowidget('middle_frame.text_form_frame.transcript_text')
 
             # get the marker colors from all the markers in the current_timeline['markers'] dict
-            marker_colors = [' '] + sorted(list(set([NLE.current_timeline['markers'][marker]['color']
-                                                     for marker in NLE.current_timeline['markers']])))
+            marker_colors = [' '] + sorted({marker['color'] for marker in NLE.current_timeline['markers'].values()})
 
             # create a list of widgets for the input dialogue
             input_widgets = [
@@ -9587,7 +9597,7 @@ class toolkit_UI():
                     {'name': 'color', 'label': 'Color:', 'type': 'option_menu',
                      'default_value': self.stAI.get_app_setting('default_marker_color',
                                                                 default_if_none='Blue'),
-                     'options': list(self.toolkit_UI_obj.resolve_marker_colors.keys())}
+                     'options': toolkit_UI.resolve_marker_color_names}
                 ]
 
                 # then we call the ask_dialogue function
@@ -12076,6 +12086,13 @@ class toolkit_UI():
             # if there are segments
             if segments:
 
+                # we're building all the lines first and insert them in the text widget with a single call
+                # since each insert call goes through Tcl and makes the widget re-layout its contents
+                text_lines = []
+
+                # we also keep track of the lines that need to be tagged as meta after the insert
+                meta_lines = []
+
                 for t_segment in segments:
 
                     # start counting the lines
@@ -12090,23 +12107,25 @@ class toolkit_UI():
                         logger.warning('No text found in segment {}. Adding empty line.'.format(t_segment.id))
                         text = ''
 
-                    insert_pos = '{}.0'.format(text_widget_line)
-
                     # count the segments
                     segment_count = segment_count + 1
 
-                    # insert the text
-                    text_widget.insert(ctk.END, text.strip() + ' ')
+                    # add the text to the lines (each segment is followed by a new line)
+                    text_lines.append(text.strip() + ' \n')
 
                     # if this is the longest segment, keep that in mind
                     if len(text) > text_widget.longest_segment_num_char:
                         text_widget.longest_segment_num_char = len(text)
 
                     if t_segment.meta:
-                        self._tag_meta_segment(text_widget, text_widget_line)
+                        meta_lines.append(text_widget_line)
+
+                # insert the text
+                text_widget.insert(ctk.END, ''.join(text_lines))
 
-                    # for now, just add 2 new lines after each segment:
-                    text_widget.insert(ctk.END, '\n')
+                # and tag all the meta segments with a single call
+                if meta_lines:
+                    self._tag_meta_segments(text_widget, meta_lines)
 
             # format the meta tags
             self._format_meta_tags(text_widget)
@@ -12134,6 +12153,16 @@ class toolkit_UI():
 
             text_widget.tag_add('l_meta', "{}.0".format(line_no), "{}.end".format(line_no))
 
+        @staticmethod
+        def _tag_meta_segments(text_widget, line_numbers):
+
+            # Tk accepts multiple start-end pairs for the same tag, so we add all the ranges in one go
+            tag_ranges = []
+            for line_no in line_numbers:
+                tag_ranges.extend(["{}.0".format(line_no), "{}.end".format(line_no)])
+
+            text_widget.tag_add('l_meta', *tag_ranges)
+
         @staticmethod
         def _tag_remove_meta_segment(text_widget, line_no):
 
@@ -12926,7 +12955,15 @@ class toolkit_UI():
                         foreground=self.theme_colors['normal'],
                         highlightcolor=self.theme_colors['dark'],
                         highlightbackground=self.theme_colors['dark'],
-                        insertbackground=self.theme_colors['normal']
+                        insertbackground=self.theme_colors['normal'],
+
+                        # we handle the transcription undo steps ourselves,
+                        # so there's no need for Tk to keep track of every insert
+                        undo=False,
+
+                        # set the top, in-between and bottom text spacing
+                        # before adding the text, so that the widget doesn't need to re-layout all the lines
+                        spacing1=0, spacing2=0.2, spacing3=5
                     )
 
                 # add a scrollbar to the text element
@@ -12950,9 +12987,6 @@ class toolkit_UI():
                     text.longest_segment_num_char = 60
                 text.config(state=ctk.DISABLED, width=text.longest_segment_num_char)
 
-                # set the top, in-between and bottom text spacing
-                text.config(spacing1=0, spacing2=0.2, spacing3=5)
-
                 # then show the text element
                 text.pack(anchor='w', expand=True, fill='both', **self.ctk_full_textbox_frame_paddings)
 
@@ -14226,7 +14260,7 @@ class toolkit_UI():
         def _select_first_group(self):
 
             # get the first group id
-            group_id = list(self._groups_data.keys())[0]
+            group_id = next(iter(self._groups_data))
 
             # select the group
             self.select_group(group_id)
@@ -14234,7 +14268,7 @@ class toolkit_UI():
         def _select_last_group(self):
 
             # get the last group id
-            group_id = list(self._groups_data.keys())[-1]
+            group_id = next(reversed(self._groups_data))
 
             # select the group
             self.select_group(group_id)
@@ -14639,7 +14673,7 @@ class toolkit_UI():
             )
 
             # get the group id
-            new_group_id = list(new_group.keys())[0]
+            new_group_id = next(iter(new_group))
 
             # add the new group to the group data
             new_groups_data = {**new_groups_data, **new_group}
@@ -18482,7 +18516,7 @@ class toolkit_UI():
                     # print('tag_name', tag_name, result['idx'])
 
                     # hash the file path so we can use it as a window id
-                    file_path_hash = hashlib.md5(result['file_path'].encode('utf-8')).hexdigest()
+                    file_path_hash = hashlib.blake2s(result['file_path'].encode('utf-8'), digest_size=8).hexdigest()
 
                     # get the file basename so we can use it as a window title
                     file_basename = os.path.basename(result['file_path'])
@@ -20753,22 +20787,52 @@ class toolkit_UI():
         # log and print to console first
         logger.info(debug_message)
 
-        # notify the user depending on which platform they're on
-        try:
-            if platform.system() == 'Darwin':  # macOS
-                os.system("""
-                                                        osascript -e 'display notification "{}" with title "{}"'
-                                                        """.format(text, title))
+        # only macOS notifications are supported for now
+        if platform.system() != 'Darwin':
+            return
 
-            elif platform.system() == 'Windows':  # Windows
-                return
-            else:  # linux variants
-                return
-        except:
-            logger.error("Cannot notify user via OS", exc_info=True)
+        # the notifications are shown one after the other by a single thread,
+        # so that the calling thread (for eg. a queue task) doesn't have to wait for them
+        with toolkit_UI._os_notifications_lock:
+            if toolkit_UI._os_notifications_thread is None:
+                toolkit_UI._os_notifications_thread = \
+                    threading.Thread(target=self._os_notifications_worker, daemon=True)
+                toolkit_UI._os_notifications_thread.start()
+
+        toolkit_UI._os_notifications.put((title, text))
+
+    @staticmethod
+    def _os_notifications_worker():
+        """
+        This shows the OS notifications from the queue, one by one (see notify_via_os)
+        """
+
+        while True:
+            title, text = toolkit_UI._os_notifications.get()
+
+            try:
+                # the title and the text are passed to the script as arguments,
+                # so that they don't need to be escaped
+                subprocess.run(['osascript',
+                                '-e', 'on run argv',
+                                '-e', 'display notification (item 2 of argv) with title (item 1 of argv)',
+                                '-e', 'end run',
+                                str(title), str(text)],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            except:
+                logger.error("Cannot notify user via OS", exc_info=True)
 
     def notify_via_messagebox(self, type='info', message_log=None, message=None, **options):
 
+        # if this was called from another thread (for eg. from a queue task),
+        # show the messagebox from the main thread (Tk isn't thread-safe)
+        # and don't make the calling thread wait for the user to close it
+        if threading.current_thread() is not threading.main_thread() and self.root is not None:
+            self.root.after(
+                0, lambda: self.notify_via_messagebox(type=type, message_log=message_log, message=message, **options)
+            )
+            return
+
         if message_log is None:
             message_log = message
 
@@ -20880,7 +20944,7 @@ def run_gui(toolkit_ops_obj, stAI):
     app_UI = toolkit_UI(toolkit_ops_obj=toolkit_ops_obj, stAI=stAI)
 
     # connect app UI to operations object
-    toolkit_ops_obj.toolkit_UI_obj = app_UI
+    toolkit_ops_obj.attach_UI(app_UI)
 
     # create the main window
     app_UI.create_main_window()